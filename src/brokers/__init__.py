@@ -1,5 +1,9 @@
+from .async_broker_longport import AsyncBrokerLongport
 from .broker_longport import BrokerLongport
+from .quote_stream import QuoteStream
 
 __all__ = [
+    "AsyncBrokerLongport",
     "BrokerLongport",
+    "QuoteStream",
 ]
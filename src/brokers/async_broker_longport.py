@@ -0,0 +1,170 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, List, Optional
+from core import AsyncBroker, CandlestickModel, QuoteModel, SecurityStaticInfoModel
+from .broker_longport import BrokerLongport
+
+
+class AsyncBrokerLongport(AsyncBroker):
+    """
+    长桥的 asyncio 封装: 当前 SDK 只有同步的 QuoteContext/TradeContext,
+    所有调用在有界线程池中执行, 不阻塞事件循环; 限速/合并/缓存沿用 BrokerLongport
+    - max_workers: 同时在途的 SDK 调用上限
+    - get_stock_static_info 的多个批次并发请求
+    """
+
+    def __init__(self, broker: BrokerLongport, max_workers: int = 8):
+        self.broker = broker
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="longport")
+
+    async def _run(self, func: Callable[..., Any], *args: Any, **kw: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kw))
+
+    async def close(self) -> None:
+        """等待已提交的调用完成后关闭线程池(不断开 broker 的连接)"""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
+
+    async def get_watchlist_by_group(self, group_name: str):
+        return await self._run(self.broker.get_watchlist_by_group, group_name)
+
+    async def watchlist(self):
+        return await self.get_watchlist_by_group("all")
+
+    async def holdings(self):
+        return await self.get_watchlist_by_group("holdings")
+
+    async def watchlist_groups(self):
+        return await self._run(lambda: self.broker.watchlistGroups)
+
+    async def account_balance(self):
+        return await self._run(lambda: self.broker.account_balance)
+
+    async def get_stock_static_info(self, symbols: List[str]) -> List[SecurityStaticInfoModel]:
+        size = self.broker.STATIC_INFO_BATCH
+        batches = [symbols[i : i + size] for i in range(0, len(symbols), size)]
+        results = await asyncio.gather(*(self._run(self.broker.get_stock_static_info, b) for b in batches))
+        return [x for batch in results for x in batch]
+
+    async def get_quotes(self, symbols: List[str]) -> List[QuoteModel]:
+        size = self.broker.QUOTE_BATCH
+        batches = [symbols[i : i + size] for i in range(0, len(symbols), size)]
+        results = await asyncio.gather(*(self._run(self.broker.get_quotes, b) for b in batches))
+        return [x for batch in results for x in batch]
+
+    async def get_history_candlesticks(
+        self,
+        symbol: str,
+        period: str = "Day",
+        since: Optional[datetime] = None,
+        count: int = 1000,
+    ) -> List[CandlestickModel]:
+        return await self._run(self.broker.get_history_candlesticks, symbol, period, since, count)
+
+
+__all__ = ["AsyncBrokerLongport"]
+
+
+if __name__ == "__main__":
+    # 同一组调用(QuoteService + TradeService 常用的查询)顺序执行 vs asyncio.gather 并发执行的耗时对比:
+    # python -m brokers.async_broker_longport                  # 真实账户, 需要 LONGPORT_* 配置
+    # python -m brokers.async_broker_longport --simulate 0.08  # 不连接长桥, 每次 SDK 调用固定延迟(秒)
+    import argparse
+    import dataclasses
+    import time
+    from decimal import Decimal
+    from types import SimpleNamespace
+    from config import get_config
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--simulate", type=float, default=None)
+    parser.add_argument("--symbols", default="700.HK,9988.HK,TSLA.US,AAPL.US,600519.SH,000001.SZ")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    symbols = args.symbols.split(",")
+
+    conf = get_config()
+    if args.simulate is None:
+        broker = BrokerLongport(conf).connect()
+    else:
+        # 每轮都真正请求自选股; 放开限速, 只比较调度方式
+        broker = BrokerLongport(dataclasses.replace(conf, longport_watchlist_ttl=0, longport_quote_qps=1000))
+
+        class SimulatedContext:
+            """按固定延迟返回固定数据, 只实现基准用到的接口"""
+
+            def _wait(self):
+                time.sleep(args.simulate)
+
+            def watchlist(self):
+                self._wait()
+                sec = SimpleNamespace(
+                    symbol="700.HK", market="HK", name="腾讯控股", watched_price=None, watched_at=None
+                )
+                return [SimpleNamespace(id=i, name=n, securities=[sec]) for i, n in enumerate(("all", "holdings"))]
+
+            def static_info(self, batch):
+                self._wait()
+                zero = Decimal(0)
+                return [
+                    SimpleNamespace(
+                        symbol=s,
+                        name_cn=s,
+                        exchange="",
+                        currency="",
+                        lot_size=1,
+                        total_shares=0,
+                        circulating_shares=0,
+                        eps=zero,
+                        eps_ttm=zero,
+                        bps=zero,
+                        dividend_yield=zero,
+                        stock_derivatives=[],
+                        board=None,
+                    )
+                    for s in batch
+                ]
+
+            def history_candlesticks_by_offset(self, symbol, *a):
+                self._wait()
+                return []
+
+            def account_balance(self):
+                self._wait()
+                return []
+
+        broker.quote_ctx = broker.trade_ctx = SimulatedContext()
+
+    def sequential():
+        broker.invalidate_watchlist()
+        broker.watchlistGroups
+        broker.holdings
+        broker.account_balance
+        broker.get_stock_static_info(symbols)
+        for s in symbols:
+            broker.get_history_candlesticks(s, count=100)
+
+    async def concurrent(ab: AsyncBrokerLongport):
+        broker.invalidate_watchlist()
+        await asyncio.gather(
+            ab.watchlist_groups(),
+            ab.holdings(),
+            ab.account_balance(),
+            ab.get_stock_static_info(symbols),
+            *(ab.get_history_candlesticks(s, count=100) for s in symbols),
+        )
+
+    async def bench():
+        async with AsyncBrokerLongport(broker, max_workers=len(symbols) + 4) as ab:
+            for i in range(args.rounds):
+                start = time.perf_counter()
+                sequential()
+                seq = time.perf_counter() - start
+                start = time.perf_counter()
+                await concurrent(ab)
+                con = time.perf_counter() - start
+                print(f"round {i + 1}: 顺序 {seq:.3f}s, gather {con:.3f}s, 加速 {seq / con:.1f}x")
+
+    asyncio.run(bench())
@@ -1,21 +1,45 @@
-from typing import List
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from longport.openapi import (
+    AdjustType,
     Config,
     Language,
+    Period,
     PushCandlestickMode,
     QuoteContext,
     TradeContext,
     HttpClient,
 )
-from core import Broker, WatchlistSecurityModel, SecurityStaticInfoModel
+from core import Broker, WatchlistSecurityModel, SecurityStaticInfoModel, CandlestickModel, QuoteModel
+from utils import RateLimiter, SingleFlight
+from .quote_stream import QuoteStream
 
 
 class BrokerLongport(Broker):
-    """长桥"""
+    """
+    长桥, 行情接口调用统一经过 RateLimiter 的 longport:quote 令牌桶
+    并发中的相同查询(同一批标的/同一段 K 线/自选股列表)合并为一次请求
+    自选股分组按 longport_watchlist_ttl 缓存快照, 快照内按组名/组 id 建索引, 查询直接读字典
+    """
+
+    STATIC_INFO_BATCH = 500  # static_info 单次请求的标的数上限
+    QUOTE_BATCH = 500  # quote 单次请求的标的数上限
 
     def __init__(self, conf):
         super().__init__()
         self.conf = conf
+        RateLimiter.configure_from(conf)
+        self._quote_limiter = RateLimiter.get("longport:quote")
+        self._inflight = SingleFlight()
+        self.watchlist_ttl = conf.longport_watchlist_ttl
+        self._watchlist_lock = threading.Lock()
+        self._watchlist_snapshot: Optional[Tuple[float, Dict[str, list], Dict[int, list], list]] = None
+        self._watchlist_generation = 0  # invalidate_watchlist 时加一, 之前开始的拉取结果不再写入快照
+        self.watchlist_hits = 0
+        self.watchlist_misses = 0
+        self._quote_stream: Optional[QuoteStream] = None
 
     def connect(
         self,
@@ -37,27 +61,81 @@ class BrokerLongport(Broker):
         self.quote_ctx: QuoteContext = QuoteContext(self.config)
         self.trade_ctx: TradeContext = TradeContext(self.config)
         self.http_cli: HttpClient = HttpClient.from_env()
+        self._quote_stream = None  # 新连接需要重新注册推送回调
         return self
 
+    @property
+    def quote_stream(self) -> QuoteStream:
+        """实时推送(报价/逐笔/盘口), 首次访问时在 quote_ctx 上注册回调"""
+        if self._quote_stream is None:
+            self._quote_stream = QuoteStream(self.quote_ctx, self.conf.quote_stream_capacity)
+        return self._quote_stream
+
+    def _load_watchlist(self):
+        """拉取自选股分组并建立 组名 -> 标的 / 组 id -> 标的 索引"""
+        groups = self.quote_ctx.watchlist()
+        by_name, by_id = {}, {}
+        for group in groups:
+            securities = [
+                WatchlistSecurityModel(
+                    symbol=x.symbol,
+                    market=x.market,
+                    name=x.name,
+                    watched_price=x.watched_price,
+                    watched_at=x.watched_at,
+                    group_id=group.id,
+                    group_name=group.name,
+                )
+                for x in group.securities
+            ]
+            by_name.setdefault(group.name, securities)
+            by_id[group.id] = securities
+        return time.monotonic(), by_name, by_id, [{"id": x.id, "name": x.name} for x in groups]
+
+    def _watchlist(self):
+        """
+        未过期的快照直接返回, 否则重新拉取(同一代的并发拉取合并为一次)
+        拉取期间发生过 invalidate_watchlist 时结果只返回给本次调用, 不写入快照
+        """
+        with self._watchlist_lock:
+            snapshot = self._watchlist_snapshot
+            if snapshot is not None and time.monotonic() - snapshot[0] < self.watchlist_ttl:
+                self.watchlist_hits += 1
+                return snapshot
+            self.watchlist_misses += 1
+            generation = self._watchlist_generation
+        snapshot = self._inflight.do(("watchlist", generation), self._load_watchlist)
+        with self._watchlist_lock:
+            if self._watchlist_generation == generation:
+                self._watchlist_snapshot = snapshot
+        return snapshot
+
+    def invalidate_watchlist(self):
+        """丢弃自选股快照(例如在 App 中修改了分组后), 下次查询重新拉取"""
+        with self._watchlist_lock:
+            self._watchlist_generation += 1
+            self._watchlist_snapshot = None
+
+    @property
+    def watchlist_cache_stats(self) -> dict:
+        snapshot = self._watchlist_snapshot
+        return {
+            "hits": self.watchlist_hits,
+            "misses": self.watchlist_misses,
+            "age": round(time.monotonic() - snapshot[0], 1) if snapshot else None,
+        }
+
     def get_watchlist_by_group(self, group_name: str):
-        tmp = next(
-            filter(
-                lambda x: x.name == group_name,
-                self.quote_ctx.watchlist(),
-            ),
-        )
-        return [
-            WatchlistSecurityModel(
-                symbol=watchlistSecurity.symbol,
-                market=watchlistSecurity.market,
-                name=watchlistSecurity.name,
-                watched_price=watchlistSecurity.watched_price,
-                watched_at=watchlistSecurity.watched_at,
-                group_id=tmp.id,
-                group_name=tmp.name,
-            )
-            for watchlistSecurity in tmp.securities
-        ]
+        by_name = self._watchlist()[1]
+        if group_name not in by_name:
+            raise KeyError(f"自选股分组不存在: {group_name}")
+        return list(by_name[group_name])
+
+    def get_watchlist_by_group_id(self, group_id: int):
+        by_id = self._watchlist()[2]
+        if group_id not in by_id:
+            raise KeyError(f"自选股分组不存在: {group_id}")
+        return list(by_id[group_id])
 
     @property
     def watchlist(self):
@@ -69,14 +147,22 @@ class BrokerLongport(Broker):
 
     @property
     def watchlistGroups(self):
-        return [{"id": x.id, "name": x.name} for x in self.quote_ctx.watchlist()]
+        return [dict(x) for x in self._watchlist()[3]]
 
     @property
     def account_balance(self):
         return self.trade_ctx.account_balance()
 
+    def _static_info(self, batch: List[str]):
+        def call():
+            self._quote_limiter.acquire()
+            return self.quote_ctx.static_info(batch)
+
+        return self._inflight.do(("static_info", tuple(sorted(batch))), call)
+
     def get_stock_static_info(self, symbols: List[str]):
-        batches = [symbols[i : i + 500] for i in range(0, len(symbols), 500)]  # 每次限流500个
+        size = self.STATIC_INFO_BATCH
+        batches = [symbols[i : i + size] for i in range(0, len(symbols), size)]
         return [
             SecurityStaticInfoModel(
                 symbol=x.symbol,
@@ -94,5 +180,65 @@ class BrokerLongport(Broker):
                 board=x.board,
             )
             for batch in batches
-            for x in self.quote_ctx.static_info(batch)
+            for x in self._static_info(batch)
+        ]
+
+    def _quote(self, batch: List[str]):
+        def call():
+            self._quote_limiter.acquire()
+            return self.quote_ctx.quote(batch)
+
+        return self._inflight.do(("quote", tuple(sorted(batch))), call)
+
+    def get_quotes(self, symbols: List[str]) -> List[QuoteModel]:
+        size = self.QUOTE_BATCH
+        batches = [symbols[i : i + size] for i in range(0, len(symbols), size)]
+        return [
+            QuoteModel(
+                symbol=x.symbol,
+                ts=x.timestamp,
+                last_done=x.last_done,
+                open=x.open,
+                high=x.high,
+                low=x.low,
+                prev_close=x.prev_close,
+                volume=x.volume,
+                turnover=x.turnover,
+            )
+            for batch in batches
+            for x in self._quote(batch)
+        ]
+
+    def get_history_candlesticks(
+        self,
+        symbol: str,
+        period: str = "Day",
+        since: Optional[datetime] = None,
+        count: int = 1000,
+    ) -> List[CandlestickModel]:
+        def call():
+            self._quote_limiter.acquire()
+            return self.quote_ctx.history_candlesticks_by_offset(
+                symbol,
+                getattr(Period, period),
+                AdjustType.NoAdjust,
+                True,  # forward: 从 since 向后取
+                count,
+                since,
+            )
+
+        candlesticks = self._inflight.do(("history_candlesticks", symbol, period, since, count), call)
+        return [
+            CandlestickModel(
+                symbol=symbol,
+                period=period,
+                ts=x.timestamp,
+                open=x.open,
+                high=x.high,
+                low=x.low,
+                close=x.close,
+                volume=x.volume,
+                turnover=x.turnover,
+            )
+            for x in candlesticks
         ]
@@ -0,0 +1,146 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Sequence
+from longport.openapi import QuoteContext, SubType
+from utils import RingBuffer, RingCursor
+
+QUOTE_DTYPE = [
+    ("ts", "M8[ms]"),
+    ("last_done", "f8"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("volume", "i8"),
+    ("turnover", "f8"),
+    ("current_volume", "i8"),
+    ("current_turnover", "f8"),
+]
+TRADE_DTYPE = [
+    ("ts", "M8[ms]"),
+    ("price", "f8"),
+    ("volume", "i8"),
+    ("direction", "i1"),  # TradeDirection: 0 中性 / 1 下跌 / 2 上涨
+]
+
+
+def _depth_dtype(levels: int) -> list:
+    return [
+        ("ts", "M8[ms]"),  # 推送中没有时间戳, 记录接收时间
+        ("bid_price", "f8", (levels,)),
+        ("bid_volume", "i8", (levels,)),
+        ("ask_price", "f8", (levels,)),
+        ("ask_volume", "i8", (levels,)),
+    ]
+
+
+class QuoteStream:
+    """
+    长桥实时推送(报价/逐笔/盘口)写入每个标的预分配的 RingBuffer
+    - SDK 回调线程中只做: 字典查找 + 一次数组元素整行赋值(写入预分配的数组, 不扩容),
+      每次推送只产生一个短命的 tuple 和字段转换的临时对象, 开销固定, 开盘突发时也不会积压
+    - 缓冲区在 subscribe 时创建, 回调线程只读取 buffers 字典(替换而不修改, 无需加锁)
+    - 消费者通过 cursor 读取数组视图, 不复制数据; 消费不及时的旧数据会被覆盖(计入 cursor.dropped)
+    """
+
+    KINDS = {"quote": SubType.Quote, "trade": SubType.Trade, "depth": SubType.Depth}
+
+    def __init__(self, quote_ctx: QuoteContext, capacity: int = 4096, depth_levels: int = 10):
+        self.quote_ctx = quote_ctx
+        self.capacity = capacity
+        self.depth_levels = depth_levels
+        self.buffers: Dict[str, Dict[str, RingBuffer]] = {kind: {} for kind in self.KINDS}
+        self.ticks = {kind: 0 for kind in self.KINDS}
+        self.unknown = 0  # 收到未订阅标的的推送次数
+        self._lock = threading.Lock()  # 只在订阅/退订时使用
+        self._depth_pad = [0] * depth_levels
+        quote_ctx.set_on_quote(self._on_quote)
+        quote_ctx.set_on_trades(self._on_trades)
+        quote_ctx.set_on_depth(self._on_depth)
+
+    def _dtype(self, kind: str):
+        return {"quote": QUOTE_DTYPE, "trade": TRADE_DTYPE, "depth": _depth_dtype(self.depth_levels)}[kind]
+
+    def subscribe(self, symbols: Iterable[str], kinds: Sequence[str] = ("quote", "trade", "depth")) -> None:
+        """订阅 symbols 的 kinds 推送, 已有的缓冲区保留(重复订阅不丢数据)"""
+        symbols = list(symbols)
+        with self._lock:
+            for kind in kinds:
+                buffers = dict(self.buffers[kind])
+                for symbol in symbols:
+                    if symbol not in buffers:
+                        buffers[symbol] = RingBuffer(self._dtype(kind), self.capacity)
+                self.buffers[kind] = buffers
+        self.quote_ctx.subscribe(symbols, [self.KINDS[kind] for kind in kinds])
+
+    def unsubscribe(self, symbols: Iterable[str], kinds: Sequence[str] = ("quote", "trade", "depth")) -> None:
+        """退订并释放缓冲区, 已有的 cursor 仍可读取剩余数据"""
+        symbols = list(symbols)
+        self.quote_ctx.unsubscribe(symbols, [self.KINDS[kind] for kind in kinds])
+        with self._lock:
+            for kind in kinds:
+                self.buffers[kind] = {k: v for k, v in self.buffers[kind].items() if k not in symbols}
+
+    def buffer(self, symbol: str, kind: str = "quote") -> RingBuffer:
+        return self.buffers[kind][symbol]
+
+    def cursor(self, symbol: str, kind: str = "quote", from_start: bool = False) -> RingCursor:
+        """symbol 的 kind 推送的读者, 见 RingBuffer.cursor"""
+        return self.buffers[kind][symbol].cursor(from_start)
+
+    @property
+    def symbols(self) -> List[str]:
+        return sorted({s for buffers in self.buffers.values() for s in buffers})
+
+    @property
+    def stats(self) -> dict:
+        return {"symbols": len(self.symbols), "ticks": dict(self.ticks), "unknown": self.unknown}
+
+    def _on_quote(self, symbol: str, quote) -> None:
+        buf = self.buffers["quote"].get(symbol)
+        if buf is None:
+            self.unknown += 1
+            return
+        buf.append(
+            (
+                int(quote.timestamp.timestamp() * 1000),
+                float(quote.last_done),
+                float(quote.open),
+                float(quote.high),
+                float(quote.low),
+                quote.volume,
+                float(quote.turnover),
+                quote.current_volume,
+                float(quote.current_turnover),
+            )
+        )
+        self.ticks["quote"] += 1
+
+    def _on_trades(self, symbol: str, push) -> None:
+        buf = self.buffers["trade"].get(symbol)
+        if buf is None:
+            self.unknown += 1
+            return
+        for t in push.trades:
+            buf.append((int(t.timestamp.timestamp() * 1000), float(t.price), t.volume, int(t.direction)))
+        self.ticks["trade"] += len(push.trades)
+
+    def _on_depth(self, symbol: str, push) -> None:
+        buf = self.buffers["depth"].get(symbol)
+        if buf is None:
+            self.unknown += 1
+            return
+        n, pad = self.depth_levels, self._depth_pad
+        bids, asks = push.bids[:n], push.asks[:n]
+        buf.append(
+            (
+                time.time_ns() // 1_000_000,
+                [float(x.price) for x in bids] + pad[len(bids) :],
+                [x.volume for x in bids] + pad[len(bids) :],
+                [float(x.price) for x in asks] + pad[len(asks) :],
+                [x.volume for x in asks] + pad[len(asks) :],
+            )
+        )
+        self.ticks["depth"] += 1
+
+
+__all__ = ["QuoteStream", "QUOTE_DTYPE", "TRADE_DTYPE"]
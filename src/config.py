@@ -20,6 +20,9 @@ class Config:
     longport_app_secret: Optional[str] = None
     longport_access_token: Optional[str] = None
     longport_log_path: Optional[str] = None
+    longport_quote_qps: int = 10  # 行情接口每秒请求上限
+    longport_watchlist_ttl: int = 60  # 自选股分组快照缓存时间(秒), 0 表示每次都重新拉取
+    quote_stream_capacity: int = 4096  # 实时推送每个标的每类数据(报价/逐笔/盘口)保留的条数
 
     # === 自选股配置 ===
     stock_list: List[str] = field(default_factory=list)
@@ -71,6 +74,15 @@ class Config:
 
     # === 数据库配置 ===
     database_path: Optional[str] = ":memory:"
+    # 读者模式: 只读访问写进程发布的快照(database_path 同目录下的 *.snapshot.duckdb)
+    database_read_only: bool = False
+    # 交易所证券列表下载的本地 HTTP 缓存目录(ETag/Last-Modified 再验证)
+    http_cache_dir: str = "./data/http_cache"
+
+    # 首次同步K线时向前回溯的天数
+    candlestick_lookback_days: int = 365
+    # 标的基本信息(STATIC_INFO)的有效期(小时), 过期后下次同步时重新拉取
+    static_info_max_age_hours: int = 24
 
     # 是否保存分析上下文快照（用于历史回溯）
     save_context_snapshot: bool = True
@@ -88,6 +100,8 @@ class Config:
 
     # === 系统配置 ===
     max_workers: int = 3  # 低并发防封禁
+    http_per_host: int = 2  # 单个站点同时在途的请求数上限
+    http_host_qps: float = 5.0  # 单个站点每秒请求数上限(令牌桶, 突发不超过 http_per_host)
     debug: bool = False
 
     # === 定时任务配置 ===
@@ -107,6 +121,13 @@ class Config:
     # - efinance/akshare_em: 东财全量接口，数据最全但容易被封
     # - tushare: Tushare Pro，需要2000积分，数据全面（付费用户可优先使用）
     realtime_source_priority: str = "tencent,akshare_sina,efinance,akshare_em"
+    # 标的列表数据源优先级(仅决定首次试探顺序, 之后按近期延迟与成功率排序):
+    # - szse/sse/hkex: 交易所官网
+    # - sina: 新浪财经(美股)
+    # - eastmoney: 东方财富(全市场)
+    security_source_priority: str = "szse,sse,hkex,sina,eastmoney"
+    # 标的列表数据源调用方式: fallback 依次降级 / race 前两名同时请求取最快
+    security_source_mode: str = "fallback"
     # 实时行情缓存时间（秒）
     realtime_cache_ttl: int = 600
     # 熔断器冷却时间（秒）
@@ -195,6 +216,9 @@ class Config:
             longport_app_secret=os.getenv("LONGPORT_APP_SECRET", ""),
             longport_access_token=os.getenv("LONGPORT_ACCESS_TOKEN", ""),
             longport_log_path=os.getenv("LONGPORT_LOG_PATH", ""),
+            longport_quote_qps=int(os.getenv("LONGPORT_QUOTE_QPS", "10")),
+            longport_watchlist_ttl=int(os.getenv("LONGPORT_WATCHLIST_TTL", "60")),
+            quote_stream_capacity=int(os.getenv("QUOTE_STREAM_CAPACITY", "4096")),
             stock_list=stock_list,
             feishu_app_id=os.getenv("FEISHU_APP_ID"),
             feishu_app_secret=os.getenv("FEISHU_APP_SECRET"),
@@ -220,6 +244,10 @@ class Config:
             analysis_delay=float(os.getenv("ANALYSIS_DELAY", "0")),
             feishu_max_bytes=int(os.getenv("FEISHU_MAX_BYTES", "20000")),
             database_path=os.getenv("DATABASE_PATH", "./data/trade4.duckdb"),
+            database_read_only=os.getenv("DATABASE_READ_ONLY", "false").lower() == "true",
+            http_cache_dir=os.getenv("HTTP_CACHE_DIR", "./data/http_cache"),
+            candlestick_lookback_days=int(os.getenv("CANDLESTICK_LOOKBACK_DAYS", "365")),
+            static_info_max_age_hours=int(os.getenv("STATIC_INFO_MAX_AGE_HOURS", "24")),
             save_context_snapshot=os.getenv("SAVE_CONTEXT_SNAPSHOT", "true").lower() == "true",
             backtest_enabled=os.getenv("BACKTEST_ENABLED", "true").lower() == "true",
             backtest_eval_window_days=int(os.getenv("BACKTEST_EVAL_WINDOW_DAYS", "10")),
@@ -229,6 +257,8 @@ class Config:
             log_dir=os.getenv("LOG_DIR", "./logs"),
             log_level=os.getenv("LOG_LEVEL", "INFO"),
             max_workers=int(os.getenv("MAX_WORKERS", "3")),
+            http_per_host=int(os.getenv("HTTP_PER_HOST", "2")),
+            http_host_qps=float(os.getenv("HTTP_HOST_QPS", "5.0")),
             debug=os.getenv("DEBUG", "false").lower() == "true",
             schedule_enabled=os.getenv("SCHEDULE_ENABLED", "false").lower() == "true",
             schedule_time=os.getenv("SCHEDULE_TIME", "18:00"),
@@ -255,8 +285,13 @@ class Config:
             # - efinance/akshare_em: 东财全量接口，数据最全但容易被封
             # - tushare: Tushare Pro，需要2000积分，数据全面
             realtime_source_priority=cls._resolve_realtime_source_priority(),
+            security_source_priority=os.getenv("SECURITY_SOURCE_PRIORITY", "szse,sse,hkex,sina,eastmoney"),
+            security_source_mode=os.getenv("SECURITY_SOURCE_MODE", "fallback"),
             realtime_cache_ttl=int(os.getenv("REALTIME_CACHE_TTL", "600")),
             circuit_breaker_cooldown=int(os.getenv("CIRCUIT_BREAKER_COOLDOWN", "300")),
+            max_retries=int(os.getenv("MAX_RETRIES", "3")),
+            retry_base_delay=float(os.getenv("RETRY_BASE_DELAY", "1.0")),
+            retry_max_delay=float(os.getenv("RETRY_MAX_DELAY", "30.0")),
         )
 
     @classmethod
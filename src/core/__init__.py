@@ -1,13 +1,24 @@
 from .ai import BaseAi
+from .async_broker import AsyncBroker
 from .broker import Broker
-from .common_dataclasses import WatchlistSecurityModel, SecurityStaticInfoModel
+from .common_dataclasses import (
+    WatchlistSecurityModel,
+    SecurityStaticInfoModel,
+    SecurityModel,
+    CandlestickModel,
+    QuoteModel,
+)
 from .market import Market
 
 
 __all__ = [
     "BaseAi",
+    "AsyncBroker",
     "Broker",
     "WatchlistSecurityModel",
     "SecurityStaticInfoModel",
+    "SecurityModel",
+    "CandlestickModel",
+    "QuoteModel",
     "Market",
 ]
@@ -0,0 +1,71 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+from .common_dataclasses import WatchlistSecurityModel, SecurityStaticInfoModel, CandlestickModel, QuoteModel
+
+
+class AsyncBroker(ABC):
+    """
+    Broker 的 asyncio 版本, 方法与 Broker 一一对应(属性改为协程方法)
+    相互独立的调用可以用 asyncio.gather 并发执行
+    """
+
+    async def __aenter__(self) -> "AsyncBroker":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @abstractmethod
+    async def close(self) -> None:
+        """释放连接/线程池等资源"""
+        pass
+
+    @abstractmethod
+    async def get_watchlist_by_group(self, group_name: str) -> List[WatchlistSecurityModel]:
+        """获取指定组名下的所有标的"""
+        pass
+
+    @abstractmethod
+    async def watchlist(self) -> List[WatchlistSecurityModel]:
+        """所有自选"""
+        pass
+
+    @abstractmethod
+    async def holdings(self) -> List[WatchlistSecurityModel]:
+        """当前持仓"""
+        pass
+
+    @abstractmethod
+    async def watchlist_groups(self) -> List[Dict[Literal["id", "name"], int | str]]:
+        """所有分组"""
+        pass
+
+    @abstractmethod
+    async def account_balance(self) -> Any:
+        """资产总览"""
+        pass
+
+    @abstractmethod
+    async def get_stock_static_info(self, symbols: List[str]) -> List[SecurityStaticInfoModel]:
+        """获取标的基本信息"""
+        pass
+
+    @abstractmethod
+    async def get_quotes(self, symbols: List[str]) -> List[QuoteModel]:
+        """获取标的实时报价(一次请求多个标的)"""
+        pass
+
+    @abstractmethod
+    async def get_history_candlesticks(
+        self,
+        symbol: str,
+        period: str = "Day",
+        since: Optional[datetime] = None,
+        count: int = 1000,
+    ) -> List[CandlestickModel]:
+        """从 since 起向后获取最多 count 根历史K线(按时间升序)"""
+        pass
+
+
+__all__ = ["AsyncBroker"]
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Literal, TypeVar, Generic
-from .common_dataclasses import WatchlistSecurityModel, SecurityStaticInfoModel
+from datetime import datetime
+from typing import List, Dict, Literal, Optional, TypeVar, Generic
+from .common_dataclasses import WatchlistSecurityModel, SecurityStaticInfoModel, CandlestickModel, QuoteModel
 
 T = TypeVar("T")
 R = TypeVar("R")
@@ -57,6 +58,22 @@ class Broker(ABC, Generic[T, R]):
         """获取标的基本信息"""
         pass
 
+    @abstractmethod
+    def get_quotes(self, symbols: List[str]) -> List[QuoteModel]:
+        """获取标的实时报价(一次请求多个标的)"""
+        pass
+
+    @abstractmethod
+    def get_history_candlesticks(
+        self,
+        symbol: str,
+        period: str = "Day",
+        since: Optional[datetime] = None,
+        count: int = 1000,
+    ) -> List[CandlestickModel]:
+        """从 since 起向后获取最多 count 根历史K线(按时间升序)"""
+        pass
+
 
 __all__ = ["Broker"]
 
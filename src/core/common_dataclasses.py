@@ -47,3 +47,44 @@ class SecurityStaticInfoModel(BaseDataclass):
     dividend_yield: Decimal = dividend_yield
     stock_derivatives: Any = stock_derivatives
     board: Any = board
+
+
+@dataclass(repr=False)
+class SecurityModel(BaseDataclass):
+    """证券主数据(SECURITY 表中的一行)"""
+
+    code: str = field(metadata={"desc": "代码", "priority": 1})
+    symbol: str = symbol
+    name: str = name_cn
+    exchange: str = exchange
+    board: Any = board
+
+
+@dataclass(repr=False)
+class CandlestickModel(BaseDataclass):
+    """K线"""
+
+    period: str = field(metadata={"desc": "周期", "priority": 1})
+    ts: datetime = field(metadata={"desc": "时间", "priority": 1})
+    open: Decimal = field(metadata={"desc": "开盘价", "priority": 2})
+    high: Decimal = field(metadata={"desc": "最高价", "priority": 2})
+    low: Decimal = field(metadata={"desc": "最低价", "priority": 2})
+    close: Decimal = field(metadata={"desc": "收盘价", "priority": 2})
+    volume: int = field(metadata={"desc": "成交量", "priority": 2})
+    turnover: Decimal = field(metadata={"desc": "成交额", "priority": 2})
+    symbol: str = symbol
+
+
+@dataclass(repr=False)
+class QuoteModel(BaseDataclass):
+    """实时报价"""
+
+    ts: datetime = field(metadata={"desc": "时间", "priority": 1})
+    last_done: Decimal = field(metadata={"desc": "最新价", "priority": 1})
+    open: Decimal = field(metadata={"desc": "开盘价", "priority": 2})
+    high: Decimal = field(metadata={"desc": "最高价", "priority": 2})
+    low: Decimal = field(metadata={"desc": "最低价", "priority": 2})
+    prev_close: Decimal = field(metadata={"desc": "昨收价", "priority": 2})
+    volume: int = field(metadata={"desc": "成交量", "priority": 2})
+    turnover: Decimal = field(metadata={"desc": "成交额", "priority": 2})
+    symbol: str = symbol
@@ -1,12 +1,13 @@
+import asyncio
 import math
 import re
 import json
-import requests
 import pandas as pd
-from multiprocessing.dummy import Pool
+import pyarrow as pa
+from utils import PageFetcher, ResiliencePolicy, SingleFlight, SourceRegistry
+from utils.duckdb_schema import BOARDS
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic, Literal
-
+from typing import Any, Callable, List, Optional, Tuple, TypeVar, Generic, Literal
 
 T = TypeVar("T")
 R = TypeVar("R")
@@ -14,159 +15,209 @@ R = TypeVar("R")
 
 class Market(ABC, Generic[T, R]):
     _instances = {}
+    EXCHANGES: Tuple[str, ...] = ()  # 该市场在 SECURITY 表中的 exchange 取值
+    _inflight = SingleFlight()  # 多个线程同时抓取同一数据源同一交易所时只抓一次, 共享同一个 DataFrame(只读)
 
     def __new__(cls, *args, **kw):
         if cls not in cls._instances:
             cls._instances[cls] = super(Market, cls).__new__(cls)
         return cls._instances[cls]
 
+    def __init__(self):
+        self._registries: List[SourceRegistry] = []  # _source_registry 创建的注册表
+
     @abstractmethod
     def spa_stock_info(self):
         pass
 
+    @abstractmethod
+    def fetch_security_list(self) -> pd.DataFrame:
+        """下载并解析标的列表, 返回 exchange/code/name/board 四列, 不写库"""
+        pass
+
+    def _load_once(self, name: str, loader: Callable[[], Any]) -> Any:
+        """cached_property 首次计算的并发保护: 多个线程同时首次访问时只执行一次 loader"""
+        return Market._inflight.do((type(self).__name__, self.db_path, name), loader)
+
+    def _source_registry(self, name: str) -> SourceRegistry:
+        """按 Config 的优先级与调用方式创建标的列表数据源注册表, 写进程中统计持久化到数据库"""
+        registry = SourceRegistry(
+            f"{type(self).__name__}.{name}",
+            self.resilience,
+            priority=[x.strip() for x in self.conf.security_source_priority.split(",") if x.strip()],
+            mode=self.conf.security_source_mode,
+            db_path=None if self.conf.database_read_only else self.db_path,
+        )
+        self._registries.append(registry)
+        return registry
+
+    def save_source_stats(self) -> None:
+        """写回各数据源注册表的统计, 与 SECURITY 一样只在写库线程中调用"""
+        for registry in self._registries:
+            registry.save()
+
+    @staticmethod
+    def reconcile(df: pd.DataFrame, exchange: str, code_width: int = 0) -> pd.DataFrame:
+        """
+        各数据源结果统一为 SECURITY 的 exchange/code/name/board:
+        代码去空白并按 code_width 补零, 名称按 NFKC 统一全角/半角并压缩空白,
+        未知板块归为 OTHER, 丢弃空代码与重复代码
+        """
+        code = df["code"].astype("string").str.strip().str.upper()
+        code = code.mask(code == "")
+        if code_width:
+            code = code.str.zfill(code_width)
+        return (
+            df.assign(
+                exchange=exchange,
+                code=code,
+                name=df["name"].astype("string").str.normalize("NFKC").str.split().str.join(" "),
+                board=df["board"].where(df["board"].isin(BOARDS), "OTHER"),
+            )
+            .loc[lambda x: x["code"].notna() & x["code"].str.len().between(1, 10)]
+            .drop_duplicates("code")[["exchange", "code", "name", "board"]]
+            .reset_index(drop=True)
+        )
+
+    @staticmethod
+    def _check_no_running_loop(name: str) -> None:
+        """同步入口内部用 asyncio.run, 在事件循环中调用时给出明确提示, 而不是 asyncio.run 的通用报错"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        raise RuntimeError(
+            f"Market.{name} 不能在事件循环中调用, 请改用 await Market.{name}_async(ex, PageFetcher(...))"
+        )
+
     @classmethod
     def fetch_stock_from_eastmoney(
-        cls, ex: Literal["SSE", "SZSE", "HKEX", "US"]
+        cls,
+        ex: Literal["SSE", "SZSE", "HKEX", "US"],
+        max_workers: int = 4,
+        per_host: int = 4,
+        policy: Optional[ResiliencePolicy] = None,
     ) -> pd.DataFrame:
         """
         东方财富网
         https://quote.eastmoney.com/center/qqzs.html
         """
+        cls._check_no_running_loop("fetch_stock_from_eastmoney")
+        return Market._inflight.do(
+            ("eastmoney", ex),
+            lambda: asyncio.run(cls.fetch_stock_from_eastmoney_async(ex, PageFetcher(max_workers, per_host, policy))),
+        )
+
+    @classmethod
+    async def fetch_stock_from_eastmoney_async(
+        cls, ex: Literal["SSE", "SZSE", "HKEX", "US"], fetcher: PageFetcher
+    ) -> pd.DataFrame:
         filter_str = {
-            "SSE": {  # 上海
-                "A-shares": "m:0+t:6+f:!2,m:0+t:80+f:!2",  # A股
-                "ChiNext": "m:0+t:80+f:!2",  # 科创板
+            "SSE": {  # 上海(m:1), 板块名称与交易所官网解析结果一致
+                "A-shares": "m:1+t:2+f:!2",  # 主板
+                "ChiNext": "m:1+t:23+f:!2",  # 科创板
             },
-            "SZSE": {  # 深圳
-                "A-shares": "m:1+t:2+f:!2,m:1+t:23+f:!2",
-                "STAR": "m:1+t:23+f:!2",  # 创业板
+            "SZSE": {  # 深圳(m:0)
+                "A-shares": "m:0+t:6+f:!2",  # 主板
+                "STAR": "m:0+t:80+f:!2",  # 创业板
             },
             "HKEX": {  # 香港
                 "Main": "m:128+t:3",  # 主板
                 "GEM": "m:128+t:4",  # 创业板
             },
             "BSE": {"A-shares": "m:0+t:81+s:262144+f:!2"},  # 北京
-            "US": {"All": "m:105,m:106,m:107"},
+            "US": {"NASDAQ": "m:105", "NYSE": "m:106", "AMEX": "m:107"},
         }
-        fields = "f12,f14"  # "code,name"
-        stk_df = pd.DataFrame()
-
-        def in_call(fs, fields, page_num=1, page_size=100):
-            try:
-                return requests.get(  # 使用 requests.get，避免 Session 线程安全问题
-                    "https://push2.eastmoney.com/api/qt/clist/get",
-                    timeout=15,
-                    headers={
-                        "Host": "push2.eastmoney.com",
-                        "Referer": "https://quote.eastmoney.com/center/gridlist.html",
-                        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
-                    },
-                    params={
-                        "np": 0,  # 是否返回非交易品种(如 ST 股、退市股等): 1:包含, 0:不包含
-                        "fs": fs,  # 筛选条件(Filter String)
-                        "fields": fields,  # 返回字段
-                        "pn": page_num,
-                        "pz": page_size,  # 最大支持100条
-                    },
-                ).json()
-            except requests.RequestException as e:
-                import sys
-
-                print(e)
-                sys.exit(1)
-
-        for board, fs in filter_str.get(ex, {}).items():
-            data = in_call(fs, fields, 1, 1)
-            total = data["data"]["total"] if data.get("data") else 0
-            if total == 0:
-                continue
-            total_pages = math.ceil(total / 100)
-            tasks = [(fs, fields, pn) for pn in range(1, total_pages + 1)]
-            with Pool(processes=4) as p:
-                results = p.map(
-                    lambda args: in_call(args[0], args[1], args[2])
-                    .get("data", {})
-                    .get("diff", []),
-                    tasks,
-                )
-            tmp_list = []
-            for diff in results:
-                if isinstance(diff, dict):
-                    diff = list(diff.values())
-                tmp_list.extend(diff)
-            stk_df = pd.concat(
-                [stk_df, pd.DataFrame(tmp_list).assign(board=board)],
-                ignore_index=True,
-            )
-        return stk_df.rename(
-            columns={
-                "f12": "code",
-                "f14": "name",
+        url = "https://push2.eastmoney.com/api/qt/clist/get"
+        headers = {
+            "Host": "push2.eastmoney.com",
+            "Referer": "https://quote.eastmoney.com/center/gridlist.html",
+            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
+        }
+
+        def params(fs, page_num=1, page_size=100):
+            return {
+                "np": 0,  # 是否返回非交易品种(如 ST 股、退市股等): 1:包含, 0:不包含
+                "fs": fs,  # 筛选条件(Filter String)
+                "fields": "f12,f14",  # 返回字段: code,name
+                "pn": page_num,
+                "pz": page_size,  # 最大支持100条
             }
-        )
+
+        boards = filter_str.get(ex, {})
+        async with fetcher:
+            # 先并发取各板块总数, 再一次性并发拉取所有板块的所有页
+            heads = await fetcher.fetch_all(url, [params(fs, 1, 1) for fs in boards.values()], headers)
+            tasks = [
+                (board, params(fs, pn))
+                for (board, fs), head in zip(boards.items(), heads)
+                for pn in range(1, math.ceil(((head.get("data") or {}).get("total") or 0) / 100) + 1)
+            ]
+            pages = await fetcher.fetch_all(url, [p for _, p in tasks], headers)
+        rows = []
+        for (board, _), page in zip(tasks, pages):
+            diff = (page.get("data") or {}).get("diff") or []
+            if isinstance(diff, dict):
+                diff = list(diff.values())
+            rows.extend({"code": x["f12"], "name": x["f14"], "board": board} for x in diff)
+        return pd.DataFrame(rows, columns=["code", "name", "board"])
 
     @classmethod
     def fetch_stock_from_sina(
-        cls, ex: Literal["SSE", "SZSE", "HKEX", "US"]
+        cls,
+        ex: Literal["SSE", "SZSE", "HKEX", "US"],
+        max_workers: int = 4,
+        per_host: int = 4,
+        policy: Optional[ResiliencePolicy] = None,
+    ) -> pd.DataFrame:
+        cls._check_no_running_loop("fetch_stock_from_sina")
+        return Market._inflight.do(
+            ("sina", ex),
+            lambda: asyncio.run(cls.fetch_stock_from_sina_async(ex, PageFetcher(max_workers, per_host, policy))),
+        )
+
+    @classmethod
+    async def fetch_stock_from_sina_async(
+        cls, ex: Literal["SSE", "SZSE", "HKEX", "US"], fetcher: PageFetcher
     ) -> pd.DataFrame:
         filter_str = {
             "US": {
                 "url": "https://stock.finance.sina.com.cn/usstock/api/jsonp.php/jQuery/US_CategoryService.getList"
             },
         }
-        stk_df = pd.DataFrame()
-
-        def in_call(fs, page_num=1, page_size=60):
-            try:
-                jsonp_str = requests.get(  # 使用 requests.get，避免 Session 线程安全问题
-                    f"{fs}",
-                    timeout=15,
-                    headers={
-                        "Referer": "https://finance.sina.com.cn/",
-                        "sec-ch-ua-platform": "Windows",
-                        "sec-fetch-dest": "script",
-                        "sec-fetch-mode": "no-cors",
-                        "sec-fetch-site": "same-site",
-                        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
-                    },
-                    params={
-                        "page": page_num,
-                        "num": page_size,
-                        "sort": "mktcap",
-                        "asc": 0,
-                        "market": None,
-                        "id": None,
-                    },
-                ).text
-                match = re.search(r"jQuery\((\{.*\})\)", jsonp_str, re.DOTALL)
-            except requests.RequestException as e:
-                import sys
-
-                print(e)
-                sys.exit(1)
+        headers = {
+            "Referer": "https://finance.sina.com.cn/",
+            "sec-ch-ua-platform": "Windows",
+            "sec-fetch-dest": "script",
+            "sec-fetch-mode": "no-cors",
+            "sec-fetch-site": "same-site",
+            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
+        }
 
+        def params(page_num=1, page_size=60):
+            return {
+                "page": page_num,
+                "num": page_size,
+                "sort": "mktcap",
+                "asc": 0,
+                "market": None,
+                "id": None,
+            }
+
+        def parse(resp) -> dict:
+            match = re.search(r"jQuery\((\{.*\})\)", resp.text, re.DOTALL)
             return json.loads(match.group(1)) if match else {}
 
-        for board, fs in filter_str.get(ex, {}).items():
-            data = in_call(fs, 1, 1)
-            total = int(data["count"]) if data else 0
-            if total == 0:
-                continue
-            total_pages = math.ceil(total / 60)
-            tasks = [(fs, pn) for pn in range(1, total_pages + 1)]
-            with Pool(processes=4) as p:
-                results = p.map(
-                    lambda args: in_call(args[0], args[1]).get("data", {}),
-                    tasks,
+        rows = []
+        async with fetcher:
+            for board, fs in filter_str.get(ex, {}).items():
+                head = await fetcher.fetch(fs, params(1, 1), headers, parse)
+                total = int(head["count"]) if head else 0
+                pages = await fetcher.fetch_all(
+                    fs, [params(pn) for pn in range(1, math.ceil(total / 60) + 1)], headers, parse
                 )
-            tmp_list = []
-            for diff in results:
-                tmp_list.extend(diff)
-            stk_df = pd.concat(
-                [stk_df, pd.DataFrame(tmp_list).assign(board=board)],
-                ignore_index=True,
-            )
-        return stk_df[["cname", "symbol", "market"]].rename(
+                rows.extend(x for page in pages for x in page.get("data") or [])
+        return pd.DataFrame(rows, columns=["cname", "symbol", "market"]).rename(
             columns={
                 "symbol": "code",
                 "cname": "name",
@@ -179,9 +230,16 @@ class Market(ABC, Generic[T, R]):
     def trading_hours(self) -> R:
         pass
 
+    @property
+    @abstractmethod
+    def security_table(self) -> pa.Table:
+        """标的列表(Arrow), 无 pandas 转换开销"""
+        pass
+
     @property
     @abstractmethod
     def security_list(self) -> pd.DataFrame:
+        """标的列表(pandas), 共享 security_table 的 Arrow 内存"""
         pass
 
 
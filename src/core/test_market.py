@@ -0,0 +1,29 @@
+import asyncio
+from core.market import Market
+from utils import PageFetcher
+
+
+class EastmoneyFetcher(PageFetcher):
+    """按 fs 返回一页固定数据, 记录请求过的筛选条件"""
+
+    def __init__(self):
+        super().__init__(concurrency=2, per_host=2)
+        self.fs = []
+
+    def _get(self, url, params, headers, parse):
+        self.fs.append(params["fs"])
+        return {"data": {"total": 1, "diff": [{"f12": params["fs"], "f14": "name"}]}}
+
+
+def _boards(ex):
+    fetcher = EastmoneyFetcher()
+    df = asyncio.run(Market.fetch_stock_from_eastmoney_async(ex, fetcher))
+    return dict(zip(df["board"], df["code"]))
+
+
+def test_eastmoney_filters():
+    # 东方财富 m:1 为上海, m:0 为深圳
+    assert _boards("SSE") == {"A-shares": "m:1+t:2+f:!2", "ChiNext": "m:1+t:23+f:!2"}
+    assert _boards("SZSE") == {"A-shares": "m:0+t:6+f:!2", "STAR": "m:0+t:80+f:!2"}
+    # 美股按交易所分板块, 而不是一个 All
+    assert _boards("US") == {"NASDAQ": "m:105", "NYSE": "m:106", "AMEX": "m:107"}
@@ -2,7 +2,7 @@ from dotenv import dotenv_values
 
 from config import get_config, Config
 from brokers import BrokerLongport
-from services import QuoteService, TradeService
+from services import QuoteCache, QuoteService, RefreshService, TradeService
 from markets import CNMarket, HKMarket, USMarket
 
 
@@ -17,8 +17,12 @@ def main():
     hkmarket = HKMarket(conf)
     usmarket = USMarket(conf)
 
+    # 并行刷新各市场标的列表(读者模式下只读快照, 不刷新)
+    if not conf.database_read_only:
+        RefreshService(conf, [cnmarket, hkmarket, usmarket]).refresh()
+
     # 初始化服务
-    quote_service = QuoteService(broker, usmarket)
+    quote_service = QuoteService(broker, usmarket, QuoteCache(broker, conf, broker.quote_stream))
     trade_service = TradeService(broker, usmarket)
 
     quote_service.test()
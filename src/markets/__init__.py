@@ -1,5 +1,21 @@
 from .cn_market import CNMarket
 from .hk_market import HKMarket
 from .us_market import USMarket
+from .security_master import (
+    SecurityMaster,
+    security_changes,
+    security_universe_at,
+    to_symbol,
+    write_security_list,
+)
 
-__all__ = ["CNMarket", "HKMarket", "USMarket"]
+__all__ = [
+    "CNMarket",
+    "HKMarket",
+    "USMarket",
+    "SecurityMaster",
+    "to_symbol",
+    "write_security_list",
+    "security_universe_at",
+    "security_changes",
+]
@@ -1,127 +1,122 @@
+import json
 import warnings
 import pandas as pd
+import pyarrow as pa
 from functools import cached_property
-from requests import Session
-from io import BytesIO
 from core import Market
-from utils import DuckDBManager
+from utils import DuckDBManager, DuckDBSchema, HttpCache, RateLimiter, ResiliencePolicy
+from utils.xlsx_reader import read_xlsx
+from .security_master import write_security_list
 
 
 class CNMarket(Market):
     """A股市场"""
 
+    EXCHANGES = ("SH", "SZ")
+
     def __init__(self, conf):
         super().__init__()
+        self.conf = conf
         self.db_path: str = conf.database_path
+        self.resilience = ResiliencePolicy.from_config(conf)
+        RateLimiter.configure_from(conf)
+        self.http_cache = HttpCache(conf.http_cache_dir)
+        self.sources = {
+            "SZ": self._source_registry("SZ")
+            .register("szse", self._spa_stock_info_from_szse)
+            .register("eastmoney", lambda: self._spa_stock_info_from_eastmoney("SZSE"), breaker="eastmoney:SZSE"),
+            "SH": self._source_registry("SH")
+            .register("sse", self._spa_stock_info_from_sse)
+            .register("eastmoney", lambda: self._spa_stock_info_from_eastmoney("SSE"), breaker="eastmoney:SSE"),
+        }
+        if conf.database_read_only:
+            DuckDBManager.use_snapshot(self.db_path)
+        else:
+            DuckDBSchema.migrate(self.db_path)
+
+    @staticmethod
+    def _parse_szse(content: bytes) -> pd.DataFrame:
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("always")
+            return (
+                read_xlsx(content, usecols=["板块", "A股代码", "A股简称"])
+                .rename(columns={"板块": "board", "A股代码": "code", "A股简称": "name"})
+                .assign(
+                    exchange="SZ",
+                    code=lambda df: df["code"]
+                    .astype(str)
+                    .str.split(".", expand=True)
+                    .iloc[:, 0]
+                    .str.zfill(6)
+                    .str.replace("000nan", ""),
+                    board=lambda df: df["board"].replace({"主板": "A-shares", "创业板": "STAR"}),
+                )[["exchange", "code", "name", "board"]]
+            )
 
     def _spa_stock_info_from_szse(self) -> pd.DataFrame:
-        with Session() as s:
-            with warnings.catch_warnings(record=True):
-                warnings.simplefilter("always")
-                return (
-                    pd.read_excel(
-                        BytesIO(
-                            s.get(
-                                "https://www.szse.cn/api/report/ShowReport",
-                                params={
-                                    "SHOWTYPE": "xlsx",
-                                    "CATALOGID": "1110",
-                                    "TABKEY": "tab1",
-                                    "random": "0.6935816432433362",
-                                },
-                                timeout=15,
-                            ).content
-                        ),
-                        usecols=["板块", "A股代码", "A股简称"],
-                    )
-                    .rename(columns={"板块": "board", "A股代码": "code", "A股简称": "name"})
-                    .assign(
-                        exchange="SZ",
-                        code=lambda df: df["code"]
-                        .astype(str)
-                        .str.split(".", expand=True)
-                        .iloc[:, 0]
-                        .str.zfill(6)
-                        .str.replace("000nan", ""),
-                        board=lambda df: df["board"].replace({"主板": "A-shares", "创业板": "STAR"}),
-                    )[["exchange", "code", "name", "board"]]
-                )
+        return self.http_cache.get_frame(
+            "https://www.szse.cn/api/report/ShowReport",
+            self._parse_szse,
+            params={
+                "SHOWTYPE": "xlsx",
+                "CATALOGID": "1110",
+                "TABKEY": "tab1",
+                "random": "0.6935816432433362",
+            },
+        )
+
+    @staticmethod
+    def _parse_sse(content: bytes) -> pd.DataFrame:
+        return pd.DataFrame(json.loads(content)["result"]).rename(
+            columns={"A_STOCK_CODE": "code", "COMPANY_ABBR": "name"}
+        )[["code", "name"]]
 
     def _spa_stock_info_from_sse(self) -> pd.DataFrame:
-        with Session() as s:
-            s.headers.update(
-                {
-                    "Host": "query.sse.com.cn",
-                    "Pragma": "no-cache",
-                    "Referer": "https://www.sse.com.cn/assortment/stock/list/share/",
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
-                }
-            )
-            params = {
-                "REG_PROVINCE": "",
-                "CSRC_CODE": "",
-                "STOCK_CODE": "",
-                "sqlId": "COMMON_SSE_CP_GPJCTPZ_GPLB_GP_L",
-                "COMPANY_STATUS": "2,4,5,7,8",
-                "type": "inParams",
-                "isPagination": "true",
-                "pageHelp.cacheSize": "1",
-                "pageHelp.beginPage": "1",
-                "pageHelp.pageSize": "10000",
-                "pageHelp.pageNo": "1",
-                "pageHelp.endPage": "1",
-            }
-            tmp_df_a = (
-                pd.DataFrame(
-                    s.get(
-                        "https://query.sse.com.cn/sseQuery/commonQuery.do",
-                        params=params | {"STOCK_TYPE": "1"},
-                    ).json()["result"]
-                )
-                .rename(columns={"A_STOCK_CODE": "code", "COMPANY_ABBR": "name"})
-                .assign(board="A-shares")
-            )[["code", "name", "board"]]
-            tmp_df_kcb = (
-                pd.DataFrame(
-                    s.get(
-                        "https://query.sse.com.cn/sseQuery/commonQuery.do",
-                        params=params | {"STOCK_TYPE": "8"},
-                    ).json()["result"]
-                )
-                .rename(columns={"A_STOCK_CODE": "code", "COMPANY_ABBR": "name"})
-                .assign(board="ChiNext")
-            )[["code", "name", "board"]]
+        url = "https://query.sse.com.cn/sseQuery/commonQuery.do"
+        headers = {
+            "Host": "query.sse.com.cn",
+            "Pragma": "no-cache",
+            "Referer": "https://www.sse.com.cn/assortment/stock/list/share/",
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
+        }
+        params = {
+            "REG_PROVINCE": "",
+            "CSRC_CODE": "",
+            "STOCK_CODE": "",
+            "sqlId": "COMMON_SSE_CP_GPJCTPZ_GPLB_GP_L",
+            "COMPANY_STATUS": "2,4,5,7,8",
+            "type": "inParams",
+            "isPagination": "true",
+            "pageHelp.cacheSize": "1",
+            "pageHelp.beginPage": "1",
+            "pageHelp.pageSize": "10000",
+            "pageHelp.pageNo": "1",
+            "pageHelp.endPage": "1",
+        }
+        tmp_df_a = self.http_cache.get_frame(url, self._parse_sse, params | {"STOCK_TYPE": "1"}, headers).assign(
+            board="A-shares"
+        )
+        tmp_df_kcb = self.http_cache.get_frame(url, self._parse_sse, params | {"STOCK_TYPE": "8"}, headers).assign(
+            board="ChiNext"
+        )
         return pd.concat([tmp_df_a, tmp_df_kcb], ignore_index=True).assign(exchange="SH")[
             ["exchange", "code", "name", "board"]
         ]
 
+    def _spa_stock_info_from_eastmoney(self, ex) -> pd.DataFrame:
+        return Market.fetch_stock_from_eastmoney(ex, self.conf.max_workers, self.conf.http_per_host, self.resilience)
+
+    def fetch_security_list(self) -> pd.DataFrame:
+        return pd.concat(
+            [Market.reconcile(self.sources[ex].fetch(), ex, code_width=6) for ex in ("SZ", "SH")],
+            ignore_index=True,
+        )
+
     def spa_stock_info(self) -> str:
         table_name = "SECURITY"
-        # stock_sz = Market.fetch_stock_from_eastmoney(
-        #     "SZSE",
-        # ).assign(
-        #     exchange="SZ",
-        #     code=lambda df: df["code"]
-        #     .astype(str)
-        #     .str.split(".", expand=True)
-        #     .iloc[:, 0]
-        #     .str.zfill(6)
-        #     .str.replace("000nan", ""),
-        # )
-        stock_sz = self._spa_stock_info_from_szse()
-        # stock_sh = Market.fetch_stock_from_eastmoney("SSE").assign(exchange="SH")
-        stock_sh = self._spa_stock_info_from_sse()
-        if DuckDBManager.table_exists(table_name, self.db_path):
-            DuckDBManager.execute(
-                f"DELETE FROM {table_name} WHERE EXCHANGE IN(?,?);",
-                self.db_path,
-                params=("SH", "SZ"),
-            )
-        DuckDBManager.insert_df(
-            table_name,
-            pd.concat([stock_sz, stock_sh], ignore_index=True),
-            self.db_path,
-        )
+        counts = write_security_list(self.db_path, self.fetch_security_list(), self.EXCHANGES)
+        self.save_source_stats()
+        print(f"CNMarket: {table_name} 新增 {counts['inserted']} 更新 {counts['updated']} 删除 {counts['deleted']}")
         return table_name
 
     @property
@@ -129,9 +124,16 @@ class CNMarket(Market):
         print("CNMarket: Getting trading hours...")
 
     @cached_property
-    def security_list(self):
-        return DuckDBManager.query_df(
-            sql="SELECT * FROM security WHERE EXCHANGE IN(?,?);",
-            db_path=self.db_path,
-            params=("SH", "SZ"),
+    def security_table(self) -> pa.Table:
+        return self._load_once(
+            "security_table",
+            lambda: DuckDBManager.query_arrow(
+                sql="SELECT * FROM security WHERE EXCHANGE IN(?::exchange_t, ?::exchange_t);",
+                db_path=self.db_path,
+                params=("SH", "SZ"),
+            ),
         )
+
+    @cached_property
+    def security_list(self) -> pd.DataFrame:
+        return self._load_once("security_list", lambda: self.security_table.to_pandas(types_mapper=pd.ArrowDtype))
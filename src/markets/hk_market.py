@@ -1,61 +1,80 @@
 import pandas as pd
+import pyarrow as pa
 from functools import cached_property
-from requests import Session
-from io import BytesIO
 from core import Market
-from utils import DuckDBManager
+from utils import DuckDBManager, DuckDBSchema, HttpCache, RateLimiter, ResiliencePolicy
+from utils.xlsx_reader import read_xlsx
+from .security_master import write_security_list
 
 
 class HKMarket(Market):
     """港股市场"""
 
+    EXCHANGES = ("HK",)
+
     def __init__(self, conf):
         super().__init__()
+        self.conf = conf
         self.db_path: str = conf.database_path
+        self.resilience = ResiliencePolicy.from_config(conf)
+        RateLimiter.configure_from(conf)
+        self.http_cache = HttpCache(conf.http_cache_dir)
+        self.sources = (
+            self._source_registry("HK")
+            .register("hkex", self._spa_stock_info_from_hkex)
+            .register("eastmoney", self._spa_stock_info_from_eastmoney, breaker="eastmoney:HKEX")
+        )
+        if conf.database_read_only:
+            DuckDBManager.use_snapshot(self.db_path)
+        else:
+            DuckDBSchema.migrate(self.db_path)
 
-    def _spa_stock_info_from_hkex(self) -> pd.DataFrame:
-        with Session() as s:
-            tmp_df = (
-                pd.read_excel(
-                    BytesIO(
-                        s.get(
-                            "https://sc.hkex.com.hk/TuniS/www.hkex.com.hk/chi/services/trading/securities/securitieslists/ListOfSecurities_c.xlsx",
-                            timeout=15,
-                        ).content
-                    ),
-                    header=2,
-                    usecols=["股份代號", "股份名稱", "分類", "次分類", "交易貨幣"],
-                )
-                .query("分類=='股本' and 交易貨幣=='HKD' and 次分類 in ['股本證券(主板)', '股本證券(創業板)']")
-                .rename(
-                    columns={
-                        "股份代號": "code",
-                        "股份名稱": "name",
-                        "次分類": "board",
-                    }
-                )
-                .assign(
-                    board=lambda df: df["board"].replace({"股本證券(主板)": "Main", "股本證券(創業板)": "GEM"}),
-                    exchange="HK",
-                    code=lambda df: df["code"].astype(str).str.zfill(5),
-                )[["exchange", "code", "name", "board"]]
+    @staticmethod
+    def _parse_hkex(content: bytes) -> pd.DataFrame:
+        return (
+            read_xlsx(
+                content,
+                header=2,
+                usecols=["股份代號", "股份名稱", "次分類"],
+                filters={
+                    "分類": ["股本"],
+                    "交易貨幣": ["HKD"],
+                    "次分類": ["股本證券(主板)", "股本證券(創業板)"],
+                },
             )
-        return tmp_df
+            .rename(
+                columns={
+                    "股份代號": "code",
+                    "股份名稱": "name",
+                    "次分類": "board",
+                }
+            )
+            .assign(
+                board=lambda df: df["board"].replace({"股本證券(主板)": "Main", "股本證券(創業板)": "GEM"}),
+                exchange="HK",
+                code=lambda df: df["code"].astype(str).str.zfill(5),
+            )[["exchange", "code", "name", "board"]]
+        )
+
+    def _spa_stock_info_from_hkex(self) -> pd.DataFrame:
+        return self.http_cache.get_frame(
+            "https://sc.hkex.com.hk/TuniS/www.hkex.com.hk/chi/services/trading/securities/securitieslists/ListOfSecurities_c.xlsx",
+            self._parse_hkex,
+        )
+
+    def _spa_stock_info_from_eastmoney(self) -> pd.DataFrame:
+        return Market.fetch_stock_from_eastmoney(
+            "HKEX", self.conf.max_workers, self.conf.http_per_host, self.resilience
+        )
+
+    def fetch_security_list(self) -> pd.DataFrame:
+        return Market.reconcile(self.sources.fetch(), "HK", code_width=5)
 
     def spa_stock_info(self) -> str:
         table_name = "SECURITY"
-        if DuckDBManager.table_exists(table_name, self.db_path):
-            DuckDBManager.execute(
-                f"DELETE FROM {table_name} WHERE EXCHANGE = ?;",
-                self.db_path,
-                params=("HK",),
-            )
-        DuckDBManager.insert_df(
-            table_name,
-            self._spa_stock_info_from_hkex(),
-            # Market.fetch_stock_from_eastmoney("HKEX").assign(exchange="HK"),
-            self.db_path,
-        )
+        counts = write_security_list(self.db_path, self.fetch_security_list(), self.EXCHANGES)
+        self.save_source_stats()
+        print(f"HKMarket: {table_name} 新增 {counts['inserted']} 更新 {counts['updated']} 删除 {counts['deleted']}")
         return table_name
 
     @property
@@ -63,9 +82,16 @@ class HKMarket(Market):
         print("HKMarket: Getting trading hours...")
 
     @cached_property
-    def security_list(self):
-        return DuckDBManager.query_df(
-            sql="SELECT * FROM security WHERE EXCHANGE = ?;",
-            db_path=self.db_path,
-            params=("HK",),
+    def security_table(self) -> pa.Table:
+        return self._load_once(
+            "security_table",
+            lambda: DuckDBManager.query_arrow(
+                sql="SELECT * FROM security WHERE EXCHANGE = ?::exchange_t;",
+                db_path=self.db_path,
+                params=("HK",),
+            ),
         )
+
+    @cached_property
+    def security_list(self) -> pd.DataFrame:
+        return self._load_once("security_list", lambda: self.security_table.to_pandas(types_mapper=pd.ArrowDtype))
@@ -0,0 +1,252 @@
+import threading
+from datetime import datetime
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import pandas as pd
+from core import SecurityModel
+from utils import DuckDBManager
+
+
+def to_symbol(exchange: str, code: str) -> str:
+    """SECURITY 中的 exchange/code 转为 ticker.region 格式, 港股去掉前导 0: 00700 -> 700.HK"""
+    if exchange == "HK":
+        code = code.lstrip("0") or "0"
+    return f"{code}.{exchange}"
+
+
+def _normalize(text: str) -> str:
+    return "".join(text.lower().split())
+
+
+def _grams(text: str) -> Set[str]:
+    """
+    名称切分为相邻二元组, 兼容中文与英文; 只有一个字时为该字本身
+    不索引单字: 股/银/科/中 等常用字的倒排表很长, 查询会给大部分标的打分
+    """
+    text = _normalize(text)
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+def write_security_list(
+    db_path: str, df: pd.DataFrame, exchanges: Sequence[str], publish: bool = True
+) -> Dict[str, int]:
+    """
+    按 exchanges 范围同步 SECURITY 表(范围外的行不受影响), 变化同时追加到 SECURITY_HISTORY,
+    并刷新 SecurityMaster 索引
+    publish=False 时不发布快照, 由调用方在批量写入结束后统一发布
+    """
+    counts = DuckDBManager.upsert_df(
+        "SECURITY",
+        df,
+        key_columns=("exchange", "code"),
+        db_path=db_path,
+        scope={"exchange": tuple(exchanges)},
+        history_table="SECURITY_HISTORY",
+    )
+    SecurityMaster.notify_refreshed(db_path, exchanges)
+    if publish:
+        DuckDBManager.publish_snapshot(db_path)
+    return counts
+
+
+def _exchange_filter(exchanges: Optional[Sequence[str]]) -> str:
+    return f"AND exchange IN ({', '.join(['?::exchange_t'] * len(exchanges))})" if exchanges else ""
+
+
+def security_universe_at(db_path: str, at: datetime, exchanges: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """时点标的池(回测用): at 时刻有效的 exchange/code/name/board"""
+    return DuckDBManager.query_df(
+        f"""
+        SELECT exchange, code, name, board FROM SECURITY_HISTORY
+        WHERE valid_from <= ? AND (valid_to IS NULL OR valid_to > ?) {_exchange_filter(exchanges)}
+        ORDER BY exchange, code;
+    """,
+        db_path,
+        params=(at, at, *(exchanges or ())),
+    )
+
+
+def security_changes(
+    db_path: str, start: datetime, end: Optional[datetime] = None, exchanges: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """
+    [start, end) 内的标的变化, change 为 listed / delisted / renamed / board_moved
+    (同时改名和换板块的记为两条)
+    """
+    return DuckDBManager.query_df(
+        f"""
+        SELECT valid_from AS changed_at, exchange, code, name, board, change
+        FROM (
+            SELECT *, CASE change_type WHEN 'insert' THEN ['listed'] WHEN 'delete' THEN ['delisted']
+                ELSE list_transform(
+                    changed_columns, c -> CASE c WHEN 'name' THEN 'renamed' WHEN 'board' THEN 'board_moved' END
+                )
+                END AS changes
+            FROM SECURITY_HISTORY
+            WHERE change_type <> 'snapshot' AND valid_from >= ? AND valid_from < ? {_exchange_filter(exchanges)}
+        ), unnest(changes) AS u(change)
+        WHERE change IS NOT NULL
+        ORDER BY changed_at, exchange, code;
+    """,
+        db_path,
+        params=(start, end or datetime.max, *(exchanges or ())),
+    )
+
+
+class _ExchangeIndex:
+    """单个交易所的索引, 构建完成后只读, 刷新时整体替换"""
+
+    def __init__(self, securities: List[SecurityModel]):
+        self.securities = securities
+        self.by_symbol: Dict[str, SecurityModel] = {}
+        self.by_code: Dict[str, SecurityModel] = {}
+        self.sorted_codes: List[Tuple[str, int]] = []
+        self.names: List[str] = []  # 规整后的名称, 单字查询时顺序扫描
+        self.name_grams: Dict[str, List[int]] = {}
+        self.gram_counts: List[int] = []
+        for i, sec in enumerate(securities):
+            self.by_symbol[sec.symbol] = sec
+            self.by_code[sec.code.upper()] = sec
+            self.sorted_codes.append((sec.code.upper(), i))
+            self.names.append(_normalize(sec.name or ""))
+            grams = _grams(sec.name or "")
+            self.gram_counts.append(len(grams))
+            for g in grams:
+                self.name_grams.setdefault(g, []).append(i)
+        self.sorted_codes.sort()
+
+    def prefix(self, prefix: str) -> Iterable[SecurityModel]:
+        i = bisect_left(self.sorted_codes, (prefix,))
+        while i < len(self.sorted_codes) and self.sorted_codes[i][0].startswith(prefix):
+            yield self.securities[self.sorted_codes[i][1]]
+            i += 1
+
+
+class SecurityMaster:
+    """
+    证券主数据内存索引, 基于 SECURITY 表按交易所分区构建
+    - get: 按 code 或 ticker.region 精确查找, O(1)
+    - search_code: 代码前缀查找, 有序数组二分
+    - search_name: 中英文名称模糊查找, 基于二元组倒排索引(单字查询顺序扫描)
+    - refresh: 只重建指定交易所的分区, spa_stock_info 写库后自动调用
+    """
+
+    _instances: Dict[str, "SecurityMaster"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._partitions: Dict[str, _ExchangeIndex] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @classmethod
+    def of(cls, db_path: str) -> "SecurityMaster":
+        """每个数据库一个实例, 首次查询时才加载"""
+        with cls._instances_lock:
+            if db_path not in cls._instances:
+                cls._instances[db_path] = cls(db_path)
+            return cls._instances[db_path]
+
+    @classmethod
+    def notify_refreshed(cls, db_path: str, exchanges: Sequence[str]) -> None:
+        """SECURITY 表刷新后调用: 已加载的实例只重建受影响的交易所"""
+        master = cls._instances.get(db_path)
+        if master is not None and master._loaded:
+            master.refresh(exchanges)
+
+    def _load(self, exchanges: Optional[Sequence[str]] = None) -> Dict[str, _ExchangeIndex]:
+        if not DuckDBManager.table_exists("SECURITY", self.db_path):
+            return {}
+        where = f"WHERE exchange IN ({', '.join(['?::exchange_t'] * len(exchanges))})" if exchanges else ""
+        table = DuckDBManager.query_arrow(
+            f"SELECT exchange, code, name, board FROM SECURITY {where};",
+            self.db_path,
+            params=tuple(exchanges) if exchanges else None,
+        )
+        grouped: Dict[str, List[SecurityModel]] = {ex: [] for ex in exchanges or ()}
+        for ex, code, name, board in zip(*(table[c].to_pylist() for c in ("exchange", "code", "name", "board"))):
+            grouped.setdefault(ex, []).append(
+                SecurityModel(code=code, symbol=to_symbol(ex, code), name=name, exchange=ex, board=board)
+            )
+        return {ex: _ExchangeIndex(secs) for ex, secs in grouped.items()}
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._partitions = self._load()
+                    self._loaded = True
+
+    def refresh(self, exchanges: Optional[Sequence[str]] = None) -> None:
+        """重新加载指定交易所(不传则全部)"""
+        partitions = self._load(exchanges)
+        with self._lock:
+            self._partitions = {**self._partitions, **partitions} if exchanges else partitions
+            self._loaded = True
+
+    def get(self, key: str) -> Optional[SecurityModel]:
+        """按 ticker.region(700.HK / 00700.HK) 或 code(600519) 精确查找"""
+        self._ensure_loaded()
+        key = key.strip().upper()
+        code, _, region = key.rpartition(".")
+        index = self._partitions.get(region) if code else None
+        if index is not None:
+            return index.by_symbol.get(to_symbol(region, code)) or index.by_code.get(code)
+        for index in self._partitions.values():
+            if key in index.by_code:
+                return index.by_code[key]
+        return None
+
+    def search_code(self, prefix: str, limit: int = 20, exchange: Optional[str] = None) -> List[SecurityModel]:
+        """代码前缀查找"""
+        self._ensure_loaded()
+        prefix = prefix.strip().upper()
+        result: List[SecurityModel] = []
+        for ex, index in self._partitions.items():
+            if exchange and ex != exchange:
+                continue
+            for sec in index.prefix(prefix):
+                result.append(sec)
+                if len(result) >= limit:
+                    return result
+        return result
+
+    def search_name(self, text: str, limit: int = 20, exchange: Optional[str] = None) -> List[SecurityModel]:
+        """
+        名称模糊查找: 按与查询共享的二元组数量打分(Dice 系数), 分数高者在前
+        单字查询没有二元组, 改为扫描包含该字的名称, 同样按 Dice 系数(名称越短越靠前)
+        """
+        self._ensure_loaded()
+        query = _grams(text)
+        if not query:
+            return []
+        normalized = _normalize(text)
+        single = normalized if len(normalized) == 1 else None
+        scored: List[Tuple[float, SecurityModel]] = []
+        for ex, index in self._partitions.items():
+            if exchange and ex != exchange:
+                continue
+            if single is None:
+                hits = Counter(i for g in query for i in index.name_grams.get(g, ()))
+            else:
+                hits = Counter(i for i, name in enumerate(index.names) if single in name)
+            scored.extend((2 * n / (len(query) + index.gram_counts[i]), index.securities[i]) for i, n in hits.items())
+        scored.sort(key=lambda x: -x[0])
+        return [sec for _, sec in scored[:limit]]
+
+    def symbols(self, exchanges: Optional[Sequence[str]] = None) -> List[str]:
+        """全部(或指定交易所)标的的 ticker.region 列表"""
+        self._ensure_loaded()
+        return [
+            sec.symbol
+            for ex, index in self._partitions.items()
+            if not exchanges or ex in exchanges
+            for sec in index.securities
+        ]
+
+
+__all__ = ["SecurityMaster", "to_symbol", "write_security_list", "security_universe_at", "security_changes"]
@@ -0,0 +1,116 @@
+import os
+import time
+from datetime import datetime
+import pandas as pd
+import pytest
+from markets.security_master import SecurityMaster, security_changes, security_universe_at, write_security_list
+from utils import DuckDBManager, DuckDBSchema
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=["exchange", "code", "name", "board"])
+
+
+def _tick():
+    """两次刷新之间留出可区分的时间点"""
+    time.sleep(0.01)
+    t = datetime.now()
+    time.sleep(0.01)
+    return t
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = os.path.join(tmp_path, "test.duckdb")
+    DuckDBSchema.migrate(path)
+    yield path
+    DuckDBManager.close()
+
+
+def test_universe_at_and_changes(db_path):
+    t0 = _tick()
+    write_security_list(
+        db_path,
+        _frame([("SZ", "000001", "平安银行", "A-shares"), ("SZ", "000002", "万科A", "A-shares")]),
+        ("SZ",),
+        publish=False,
+    )
+    t1 = _tick()
+    write_security_list(
+        db_path,
+        _frame([("SZ", "000001", "平安", "STAR"), ("SZ", "300001", "特锐德", "STAR")]),
+        ("SZ",),
+        publish=False,
+    )
+    t2 = _tick()
+
+    assert security_universe_at(db_path, t0).empty
+    assert security_universe_at(db_path, t1)["name"].tolist() == ["平安银行", "万科A"]
+    at_t2 = security_universe_at(db_path, t2, exchanges=("SZ",))
+    assert at_t2[["code", "name", "board"]].values.tolist() == [
+        ["000001", "平安", "STAR"],
+        ["300001", "特锐德", "STAR"],
+    ]
+    assert security_universe_at(db_path, t2, exchanges=("SH",)).empty
+
+    changes = security_changes(db_path, t1, t2)
+    assert sorted(zip(changes["code"], changes["change"])) == [
+        ("000001", "board_moved"),
+        ("000001", "renamed"),
+        ("000002", "delisted"),
+        ("300001", "listed"),
+    ]
+    assert sorted(security_changes(db_path, t0, t1)["change"]) == ["listed", "listed"]
+    assert len(security_changes(db_path, t0)) == 6
+
+
+@pytest.fixture
+def master(db_path):
+    write_security_list(
+        db_path,
+        _frame(
+            [
+                ("SH", "600519", "贵州茅台", "A-shares"),
+                ("SH", "601318", "中国平安", "A-shares"),
+                ("SH", "600000", "浦发银行", "A-shares"),
+                ("SZ", "000001", "平安银行", "A-shares"),
+                ("SZ", "002091", "江苏国泰", "A-shares"),
+                ("HK", "00700", "腾讯控股", "Main"),
+                ("HK", "01833", "平安好医生", "Main"),
+            ]
+        ),
+        ("SH", "SZ", "HK"),
+        publish=False,
+    )
+    return SecurityMaster(db_path)
+
+
+def test_get_exact_and_missing(master):
+    assert master.get("600519").name == "贵州茅台"
+    assert master.get("600519.sh").symbol == "600519.SH"
+    assert master.get("700.HK").code == "00700"
+    assert master.get("00700.HK").symbol == "700.HK"
+    assert master.get("999999") is None
+    assert master.get("600519.SZ") is None
+    assert master.get("700.US") is None
+
+
+def test_search_code_prefix(master):
+    assert [s.code for s in master.search_code("600", exchange="SH")] == ["600000", "600519"]
+    assert sorted(s.symbol for s in master.search_code("00")) == ["000001.SZ", "002091.SZ", "700.HK"]
+    assert [s.symbol for s in master.search_code("00", exchange="HK")] == ["700.HK"]
+    assert len(master.search_code("00", limit=2)) == 2
+    assert master.search_code("9") == []
+
+
+def test_search_name_ranking(master):
+    names = [s.name for s in master.search_name("平安银行")]
+    assert names[0] == "平安银行"  # 3 个二元组全部命中
+    assert set(names[1:3]) == {"中国平安", "浦发银行"}  # 各命中 1 个, 名称同长
+    assert names[3] == "平安好医生"  # 命中 1 个, 名称更长
+    assert "江苏国泰" not in names
+    assert [s.name for s in master.search_name("平安", exchange="HK")] == ["平安好医生"]
+    assert master.search_name("茅台")[0].code == "600519"
+    assert [s.name for s in master.search_name("银")] == ["平安银行", "浦发银行"]  # 单字: 扫描
+    assert master.search_name("股份") == []
+    assert master.search_name("  ") == []
@@ -1,29 +1,46 @@
 import pandas as pd
+import pyarrow as pa
 from functools import cached_property
 from core import Market
-from utils import DuckDBManager
+from utils import DuckDBManager, DuckDBSchema, RateLimiter, ResiliencePolicy
+from .security_master import write_security_list
 
 
 class USMarket(Market):
     """美股市场"""
 
+    EXCHANGES = ("US",)
+
     def __init__(self, conf):
         super().__init__()
+        self.conf = conf
         self.db_path: str = conf.database_path
+        self.resilience = ResiliencePolicy.from_config(conf)
+        RateLimiter.configure_from(conf)
+        self.sources = (
+            self._source_registry("US")
+            .register("sina", lambda: Market.fetch_stock_from_sina("US", *self._fetch_args), breaker="sina:US")
+            .register(
+                "eastmoney", lambda: Market.fetch_stock_from_eastmoney("US", *self._fetch_args), breaker="eastmoney:US"
+            )
+        )
+        if conf.database_read_only:
+            DuckDBManager.use_snapshot(self.db_path)
+        else:
+            DuckDBSchema.migrate(self.db_path)
+
+    @property
+    def _fetch_args(self):
+        return self.conf.max_workers, self.conf.http_per_host, self.resilience
+
+    def fetch_security_list(self) -> pd.DataFrame:
+        return Market.reconcile(self.sources.fetch(), "US")
 
     def spa_stock_info(self) -> str:
         table_name = "SECURITY"
-        if DuckDBManager.table_exists(table_name, self.db_path):
-            DuckDBManager.execute(
-                f"DELETE FROM {table_name} WHERE EXCHANGE = ?;",
-                self.db_path,
-                params=("US",),
-            )
-        DuckDBManager.insert_df(
-            table_name,
-            Market.fetch_stock_from_sina("US").assign(exchange="US")[["exchange", "code", "name", "board"]],
-            self.db_path,
-        )
+        counts = write_security_list(self.db_path, self.fetch_security_list(), self.EXCHANGES)
+        self.save_source_stats()
+        print(f"USMarket: {table_name} 新增 {counts['inserted']} 更新 {counts['updated']} 删除 {counts['deleted']}")
         return table_name
 
     @property
@@ -31,9 +48,16 @@ class USMarket(Market):
         print("USMarket: Getting trading hours...")
 
     @cached_property
-    def security_list(self):
-        return DuckDBManager.query_df(
-            sql="SELECT * FROM security WHERE EXCHANGE = ?;",
-            db_path=self.db_path,
-            params=("US",),
+    def security_table(self) -> pa.Table:
+        return self._load_once(
+            "security_table",
+            lambda: DuckDBManager.query_arrow(
+                sql="SELECT * FROM security WHERE EXCHANGE = ?::exchange_t;",
+                db_path=self.db_path,
+                params=("US",),
+            ),
         )
+
+    @cached_property
+    def security_list(self) -> pd.DataFrame:
+        return self._load_once("security_list", lambda: self.security_table.to_pandas(types_mapper=pd.ArrowDtype))
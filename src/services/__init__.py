@@ -1,4 +1,7 @@
-from .quote_service import QuoteService
+from .quote_service import QuoteCache, QuoteService
 from .trade_service import TradeService
+from .candlestick_service import CandlestickService
+from .refresh_service import RefreshService
+from .static_info_service import StaticInfoService
 
-__all__ = ["QuoteService", "TradeService"]
+__all__ = ["QuoteCache", "QuoteService", "TradeService", "CandlestickService", "RefreshService", "StaticInfoService"]
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from multiprocessing.dummy import Pool
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from core import Broker, CandlestickModel
+from utils import DuckDBManager
+
+
+class CandlestickService:
+    """
+    历史K线增量同步
+    - CANDLESTICK: K线明细 (symbol, period, ts, open, high, low, close, volume, turnover), (symbol, period, ts) 主键
+    - CANDLESTICK_SYNC: 每个 symbol/period 的高水位 (symbol, period, last_ts, synced_at)
+    每次只拉取高水位之后的K线, 全部标的拉取完成后一次性批量写入
+    """
+
+    TABLE = "CANDLESTICK"
+    SYNC_TABLE = "CANDLESTICK_SYNC"
+    PAGE_SIZE = 1000  # 单次请求最多返回的K线数
+
+    def __init__(self, broker, conf):
+        self.broker: Broker = broker
+        self.db_path: str = conf.database_path
+        self.max_workers: int = conf.max_workers
+        self.lookback = timedelta(days=conf.candlestick_lookback_days)
+
+    def high_water_marks(self, symbols: List[str], period: str) -> Dict[str, datetime]:
+        """各 symbol 已入库的最新K线时间"""
+        if not symbols or not DuckDBManager.table_exists(self.SYNC_TABLE, self.db_path):
+            return {}
+        placeholders = ", ".join("?" * len(symbols))
+        df = DuckDBManager.query_df(
+            f"SELECT symbol, last_ts FROM {self.SYNC_TABLE} WHERE period = ? AND symbol IN ({placeholders});",
+            self.db_path,
+            params=(period, *symbols),
+        )
+        return dict(zip(df["symbol"], df["last_ts"].dt.to_pydatetime()))
+
+    def _fetch_missing(self, symbol: str, period: str, since: datetime) -> List[CandlestickModel]:
+        bars: List[CandlestickModel] = []
+        while True:
+            page = self.broker.get_history_candlesticks(symbol, period, since, self.PAGE_SIZE)
+            bars.extend(x for x in page if x.ts > since)
+            if len(page) < self.PAGE_SIZE:
+                return bars
+            since = page[-1].ts
+
+    def sync(self, symbols: List[str], period: str = "Day") -> Dict[str, int]:
+        """
+        增量同步 symbols 的 period 周期K线, 返回每个 symbol 新写入的K线数
+        单个 symbol 失败不影响其他 symbol, 其高水位保持不变, 下次同步时重试
+        """
+        hwm = self.high_water_marks(symbols, period)
+        default_since = datetime.now() - self.lookback
+
+        def in_call(symbol: str) -> Tuple[str, Optional[List[CandlestickModel]]]:
+            try:
+                return symbol, self._fetch_missing(symbol, period, hwm.get(symbol, default_since))
+            except Exception as e:
+                print(f"CandlestickService: {symbol} {period} 同步失败: {e}")
+                return symbol, None
+
+        with Pool(processes=self.max_workers) as p:
+            results = p.map(in_call, symbols)
+
+        bars = [bar for _, fetched in results if fetched for bar in fetched]
+        if bars:
+            # 按 (symbol, period, ts) 幂等写入: 写完K线、更新高水位前中断时, 重跑不会产生重复K线;
+            # 抓取的K线都在高水位之后, 直接按主键写入, 不与整张 CANDLESTICK 比对
+            DuckDBManager.insert_or_replace_df(
+                self.TABLE,
+                pd.DataFrame(
+                    {
+                        "symbol": [x.symbol for x in bars],
+                        "period": [x.period for x in bars],
+                        "ts": [x.ts for x in bars],
+                        "open": [float(x.open) for x in bars],
+                        "high": [float(x.high) for x in bars],
+                        "low": [float(x.low) for x in bars],
+                        "close": [float(x.close) for x in bars],
+                        "volume": [x.volume for x in bars],
+                        "turnover": [float(x.turnover) for x in bars],
+                    }
+                ),
+                key_columns=("symbol", "period", "ts"),
+                db_path=self.db_path,
+            )
+            synced_at = datetime.now()
+            DuckDBManager.upsert_df(
+                self.SYNC_TABLE,
+                pd.DataFrame(
+                    [(s, period, fetched[-1].ts, synced_at) for s, fetched in results if fetched],
+                    columns=["symbol", "period", "last_ts", "synced_at"],
+                ),
+                key_columns=("symbol", "period"),
+                db_path=self.db_path,
+            )
+        return {s: len(fetched) for s, fetched in results if fetched is not None}
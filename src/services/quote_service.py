@@ -1,11 +1,206 @@
-from typing import List
-from core import Broker, Market
+import threading
+import time
+from typing import Dict, List, Optional, Set
+import numpy as np
+import pandas as pd
+from core import Broker, Market, QuoteModel
+
+
+class _Batch:
+    """一次合并后的 quote 请求"""
+
+    __slots__ = ("symbols", "done", "error")
+
+    def __init__(self):
+        self.symbols: Set[str] = set()
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class QuoteCache:
+    """
+    实时报价缓存, 按列存放在 numpy 数组中(symbol -> 行号), 有效期为 Config.realtime_cache_ttl
+    - 未命中的标的先等待 batch_window 秒, 期间其他线程的未命中并入同一批, 一次 get_quotes 请求
+    - 传入 stream(QuoteStream) 时, 推送中的标的取环形缓冲区的最新一行, 同样按 ttl 判断新旧(推送中断后回退到请求);
+      推送中没有昨收价, 从未经 get_quotes 补全过的标的先请求一次
+    - stats: 命中率、推送更新次数、合并批次与缓存数据的新旧程度
+    """
+
+    COLUMNS = ("last_done", "open", "high", "low", "prev_close", "turnover")
+
+    def __init__(self, broker, conf, stream=None, batch_window: float = 0.005, capacity: int = 1024):
+        self.broker: Broker = broker
+        self.ttl: float = conf.realtime_cache_ttl
+        self.stream = stream
+        self.batch_window = batch_window
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._values = {c: np.full(capacity, np.nan) for c in self.COLUMNS}
+        self._volume = np.zeros(capacity, dtype="i8")
+        self._ts = np.zeros(capacity, dtype="M8[ms]")
+        self._updated = np.zeros(capacity)  # time.monotonic() 写入时间
+        self._stream_seq: Dict[str, int] = {}
+        self._rest_filled: Set[str] = set()  # 经 get_quotes 写入过(有昨收价)的标的
+        self._pending: Dict[str, _Batch] = {}  # 正在请求(或等待合并)的标的
+        self._collecting: Optional[_Batch] = None
+        self.hits = self.misses = self.stream_updates = self.batches = self.batched_symbols = 0
+
+    def _row(self, symbol: str) -> int:
+        """symbol 的行号, 新标的追加一行(容量不足时翻倍), 调用方持有 _lock"""
+        i = self._index.get(symbol)
+        if i is None:
+            i = self._index[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+            if i >= len(self._updated):
+                n = len(self._updated)
+                for c in self.COLUMNS:
+                    self._values[c] = np.concatenate([self._values[c], np.full(n, np.nan)])
+                self._volume = np.concatenate([self._volume, np.zeros(n, dtype="i8")])
+                self._ts = np.concatenate([self._ts, np.zeros(n, dtype="M8[ms]")])
+                self._updated = np.concatenate([self._updated, np.zeros(n)])
+        return i
+
+    def _store(self, quotes: List[QuoteModel]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for q in quotes:
+                i = self._row(q.symbol)
+                for c in self.COLUMNS:
+                    v = getattr(q, c)
+                    self._values[c][i] = np.nan if v is None else float(v)
+                self._volume[i] = q.volume
+                self._ts[i] = np.datetime64(int(q.ts.timestamp() * 1000), "ms")
+                self._updated[i] = now
+                self._rest_filled.add(q.symbol)
+
+    def _apply_stream(self, symbols: List[str], now: float) -> None:
+        """用推送数据更新缓存(有新推送时刷新写入时间, 推送中断则照常过期), 调用方持有 _lock"""
+        if self.stream is None:
+            return
+        buffers = self.stream.buffers["quote"]
+        for symbol in symbols:
+            buf = buffers.get(symbol)
+            if buf is None:
+                continue
+            if buf.seq > self._stream_seq.get(symbol, 0):
+                row = buf.last()
+                i = self._row(symbol)
+                for c in ("last_done", "open", "high", "low", "turnover"):
+                    self._values[c][i] = row[c]
+                self._volume[i] = row["volume"]
+                self._ts[i] = row["ts"]
+                self._updated[i] = now
+                self._stream_seq[symbol] = buf.seq
+                self.stream_updates += 1
+
+    def _fetch(self, missing: List[str]) -> None:
+        """未命中的标的并入正在收集的批次(或已在请求中的批次), 等待结果"""
+        leader = None
+        waits = set()
+        with self._lock:
+            for symbol in missing:
+                batch = self._pending.get(symbol)
+                if batch is None:
+                    if self._collecting is None:
+                        leader = self._collecting = _Batch()
+                    batch = self._collecting
+                    batch.symbols.add(symbol)
+                    self._pending[symbol] = batch
+                waits.add(batch)
+        if leader is not None:
+            time.sleep(self.batch_window)
+            with self._lock:
+                self._collecting = None
+                self.batches += 1
+                self.batched_symbols += len(leader.symbols)
+            try:
+                self._store(self.broker.get_quotes(sorted(leader.symbols)))
+            except Exception as e:
+                leader.error = e
+            finally:
+                with self._lock:
+                    for symbol in leader.symbols:
+                        del self._pending[symbol]
+                leader.done.set()
+        for batch in waits:
+            batch.done.wait()
+            if batch.error is not None:
+                raise batch.error
+
+    def get(self, symbols: List[str]) -> pd.DataFrame:
+        """
+        symbols 的最新报价, 列为 symbol/ts/last_done/open/high/low/prev_close/volume/turnover/age(缓存秒数)
+        券商没有返回的标的不在结果中
+        """
+        symbols = list(dict.fromkeys(symbols))
+        now = time.monotonic()
+        with self._lock:
+            self._apply_stream(symbols, now)
+            # 只有推送数据(没有昨收价)的标的也算未命中, 请求一次补全
+            missing = [
+                s for s in symbols if s not in self._rest_filled or now - self._updated[self._index[s]] >= self.ttl
+            ]
+            self.hits += len(symbols) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            self._fetch(missing)
+        with self._lock:
+            rows = [self._index[s] for s in symbols if s in self._index]
+            df = pd.DataFrame(
+                {
+                    "symbol": [self._symbols[i] for i in rows],
+                    "ts": self._ts[rows],
+                    **{c: self._values[c][rows] for c in self.COLUMNS},
+                    "volume": self._volume[rows],
+                    "age": time.monotonic() - self._updated[rows],
+                }
+            )
+        return df[["symbol", "ts", "last_done", "open", "high", "low", "prev_close", "volume", "turnover", "age"]]
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        df = self.get([symbol])
+        return None if df.empty else float(df["last_done"].iloc[0])
+
+    def invalidate(self, symbols: Optional[List[str]] = None) -> None:
+        """标记为过期(不传则全部), 下次 get 时重新请求"""
+        with self._lock:
+            rows = slice(None) if symbols is None else [self._index[s] for s in symbols if s in self._index]
+            self._updated[rows] = -np.inf
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            n = len(self._symbols)
+            age = time.monotonic() - self._updated[:n]
+            stale = int((age >= self.ttl).sum())  # 含 invalidate 过的
+            age = age[np.isfinite(age)]
+            requests = self.hits + self.misses
+            return {
+                "symbols": n,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / requests, 3) if requests else None,
+                "stream_updates": self.stream_updates,
+                "batches": self.batches,
+                "avg_batch": round(self.batched_symbols / self.batches, 1) if self.batches else None,
+                "stale": stale,
+                "mean_age": round(float(age.mean()), 1) if len(age) else None,
+                "max_age": round(float(age.max()), 1) if len(age) else None,
+            }
 
 
 class QuoteService:
-    def __init__(self, broker, market):
+    def __init__(self, broker, market, quote_cache: Optional[QuoteCache] = None):
         self.broker: Broker = broker
         self.market: Market = market
+        self.quote_cache = quote_cache
+
+    def quotes(self, symbols: List[str]) -> pd.DataFrame:
+        """最新报价, 有 quote_cache 时经过缓存"""
+        if self.quote_cache is not None:
+            return self.quote_cache.get(symbols)
+        return pd.DataFrame([vars(x) for x in self.broker.get_quotes(symbols)])
 
     def test(self):
         # print(self.broker.watchlist)
@@ -14,7 +209,7 @@ class QuoteService:
         # print(self.broker.holdings)
         # print(self.broker.get_stock_static_info(["06288.HK", "TSLA.US", "002091.SZ"]))
         #
-        self.market.spa_stock_info()
+        # self.market.spa_stock_info()  # 标的列表由 RefreshService 统一刷新
         print(
             # self.market.security_list.query(
             #     "code in ['000001','300001','600004','688678']"
@@ -0,0 +1,83 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Sequence, Tuple
+import pandas as pd
+from core import Market
+from markets import write_security_list
+from utils import DuckDBManager, RateLimiter
+
+
+class RefreshService:
+    """
+    多市场标的列表并行刷新
+    - 各市场的下载与解析在独立线程中并行执行(网络等待完全重叠)
+    - 写库只在调用线程中进行: 哪个市场先完成就先写入, 写入与其余市场的下载重叠;
+      数据源统计(SOURCE_STATS)在全部下载结束后写入
+    - 某个市场抓取或写入失败不影响其他市场, 其 SECURITY 数据保持不变
+    - 全部完成后只发布一次快照
+    """
+
+    def __init__(self, conf, markets: Sequence[Market]):
+        self.db_path: str = conf.database_path
+        self.markets: List[Market] = list(markets)
+
+    def _fetch(self, market: Market) -> Tuple[pd.DataFrame, float]:
+        start = time.perf_counter()
+        df = market.fetch_security_list()
+        return df, time.perf_counter() - start
+
+    def refresh(self) -> Dict[str, dict]:
+        """
+        返回各市场的刷新结果:
+        {市场: {"ok", "rows", "fetch_s", "write_s", "inserted", "updated", "deleted", "error"}}
+        """
+        start = time.perf_counter()
+        report: Dict[str, dict] = {}
+        with ThreadPoolExecutor(max_workers=len(self.markets) or 1, thread_name_prefix="refresh") as pool:
+            futures = {pool.submit(self._fetch, m): m for m in self.markets}
+            for future in as_completed(futures):
+                market = futures[future]
+                name = type(market).__name__
+                try:
+                    df, fetch_s = future.result()
+                except Exception as e:
+                    report[name] = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                    continue
+                write_start = time.perf_counter()
+                try:
+                    counts = write_security_list(self.db_path, df, market.EXCHANGES, publish=False)
+                except Exception as e:  # 写入在事务中, 失败时该市场数据保持不变
+                    report[name] = {"ok": False, "error": f"写入失败 {type(e).__name__}: {e}"}
+                    continue
+                report[name] = {
+                    "ok": True,
+                    "rows": len(df),
+                    "fetch_s": fetch_s,
+                    "write_s": time.perf_counter() - write_start,
+                    **counts,
+                }
+        for market in self.markets:  # 数据源统计也只在调用线程中写库
+            market.save_source_stats()
+        report = {type(m).__name__: report[type(m).__name__] for m in self.markets}
+        if any(r["ok"] for r in report.values()):
+            DuckDBManager.publish_snapshot(self.db_path)
+        self._print_report(report, time.perf_counter() - start)
+        return report
+
+    @staticmethod
+    def _print_report(report: Dict[str, dict], total_s: float) -> None:
+        for name, r in report.items():
+            if r["ok"]:
+                print(
+                    f"RefreshService: {name:<9} 抓取 {r['fetch_s']:6.2f}s 写入 {r['write_s']:5.2f}s "
+                    f"{r['rows']} 行, 新增 {r['inserted']} 更新 {r['updated']} 删除 {r['deleted']}"
+                )
+            else:
+                print(f"RefreshService: {name:<9} 失败, 保留已有数据: {r['error']}")
+        print(
+            f"RefreshService: 共 {len(report)} 个市场, 成功 {sum(r['ok'] for r in report.values())}, 总耗时 {total_s:.2f}s"
+        )
+        RateLimiter.print_stats()
+
+
+__all__ = ["RefreshService"]
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+from multiprocessing.dummy import Pool
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from core import Broker, SecurityStaticInfoModel
+from markets import SecurityMaster
+from utils import DuckDBManager, DuckDBSchema
+
+
+def _name(value) -> Optional[str]:
+    """券商 SDK 的枚举值转为名称: SecurityBoard.HKEquity -> HKEquity"""
+    return None if value is None else str(value).rsplit(".", 1)[-1]
+
+
+def _float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _key(symbol: str) -> str:
+    """券商返回的 symbol 可能补零或改大小写: 00700.hk -> 700.HK"""
+    code, _, suffix = symbol.strip().upper().partition(".")
+    return f"{code.lstrip('0') or '0'}.{suffix}" if suffix else code
+
+
+class StaticInfoService:
+    """
+    标的基本信息增量同步
+    - STATIC_INFO: 每个 symbol 一行, fetched_at 为拉取时间
+    - 只拉取缺失或超过 static_info_max_age_hours 的 symbol, 每批 BATCH_SIZE 个, max_workers 批并发
+      (请求速率由券商的 longport:quote 令牌桶控制)
+    - 每 max_workers 批写入一次, 中途中断时已完成的部分不会重复拉取
+    """
+
+    TABLE = "STATIC_INFO"
+    BATCH_SIZE = 500  # 与 BrokerLongport.STATIC_INFO_BATCH 一致, 每批一次请求
+
+    def __init__(self, broker, conf):
+        self.broker: Broker = broker
+        self.db_path: str = conf.database_path
+        self.max_workers: int = conf.max_workers
+        self.max_age = timedelta(hours=conf.static_info_max_age_hours)
+        DuckDBSchema.migrate(self.db_path)
+
+    def stale(self, symbols: List[str]) -> List[str]:
+        """symbols 中缺失或已过期的部分, 保持原顺序"""
+        fresh = set(
+            DuckDBManager.query_df(
+                f"SELECT symbol FROM {self.TABLE} WHERE fetched_at >= ?;",
+                self.db_path,
+                params=(datetime.now() - self.max_age,),
+            )["symbol"]
+        )
+        return [s for s in dict.fromkeys(symbols) if s not in fresh]
+
+    @staticmethod
+    def _match(batch: List[str], infos: List[SecurityStaticInfoModel]) -> Dict[str, SecurityStaticInfoModel]:
+        """按规范化后的 symbol 把返回结果对应回请求的 symbol"""
+        by_key = {_key(x.symbol): x for x in infos}
+        return {s: by_key[_key(s)] for s in batch if _key(s) in by_key}
+
+    @classmethod
+    def _rows(cls, batch: List[str], infos: List[SecurityStaticInfoModel], fetched_at: datetime) -> List[tuple]:
+        found = cls._match(batch, infos)
+        rows = []
+        for symbol in batch:
+            x = found.get(symbol)
+            if x is None:  # 券商不认识的 symbol 也记一行, 过期前不再请求
+                rows.append((symbol, *([None] * 12), fetched_at))
+                continue
+            rows.append(
+                (
+                    symbol,
+                    x.name,
+                    x.exchange,
+                    x.currency,
+                    x.lot_size,
+                    x.total_shares,
+                    x.circulating_shares,
+                    _float(x.eps),
+                    _float(x.eps_ttm),
+                    _float(x.bps),
+                    _float(x.dividend_yield),
+                    [_name(d) for d in x.stock_derivatives or ()],
+                    _name(x.board),
+                    fetched_at,
+                )
+            )
+        return rows
+
+    def _write(self, rows: List[tuple]) -> None:
+        columns = [
+            "symbol",
+            "name",
+            "exchange",
+            "currency",
+            "lot_size",
+            "total_shares",
+            "circulating_shares",
+            "eps",
+            "eps_ttm",
+            "bps",
+            "dividend_yield",
+            "stock_derivatives",
+            "board",
+            "fetched_at",
+        ]
+        DuckDBManager.upsert_df(self.TABLE, pd.DataFrame(rows, columns=columns), ("symbol",), self.db_path)
+
+    def sync(self, symbols: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        刷新 symbols(不传则为 SECURITY 中的全部标的)中缺失或过期的基本信息
+        单批失败不影响其他批, 这些 symbol 保持过期状态, 下次同步时重试
+        返回 {"requested", "stale", "fetched", "unknown", "failed"}:
+        fetched 为券商返回了信息的标的数, unknown 为券商没有返回(只写入占位行)的标的数
+        """
+        symbols = SecurityMaster.of(self.db_path).symbols() if symbols is None else symbols
+        stale = self.stale(symbols)
+        batches = [stale[i : i + self.BATCH_SIZE] for i in range(0, len(stale), self.BATCH_SIZE)]
+
+        def in_call(batch: List[str]) -> Tuple[List[str], Optional[List[SecurityStaticInfoModel]]]:
+            try:
+                return batch, self.broker.get_stock_static_info(batch)
+            except Exception as e:
+                print(f"StaticInfoService: {batch[0]}..{batch[-1]} ({len(batch)} 个) 拉取失败: {e}")
+                return batch, None
+
+        fetched = unknown = failed = 0
+        with Pool(processes=self.max_workers) as p:
+            for i in range(0, len(batches), self.max_workers):
+                results = p.map(in_call, batches[i : i + self.max_workers])
+                fetched_at = datetime.now()
+                rows = [
+                    row for batch, infos in results if infos is not None for row in self._rows(batch, infos, fetched_at)
+                ]
+                if rows:
+                    self._write(rows)
+                found = sum(len(self._match(batch, infos)) for batch, infos in results if infos is not None)
+                fetched += found
+                unknown += len(rows) - found
+                failed += sum(len(batch) for batch, infos in results if infos is None)
+        report = {
+            "requested": len(symbols),
+            "stale": len(stale),
+            "fetched": fetched,
+            "unknown": unknown,
+            "failed": failed,
+        }
+        print(f"StaticInfoService: {report}")
+        return report
+
+    def load(self, symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """从 STATIC_INFO 读取(不触发拉取), 不传 symbols 时返回全部"""
+        df = DuckDBManager.query_df(f"SELECT * FROM {self.TABLE} ORDER BY symbol;", self.db_path)
+        return df if symbols is None else df[df["symbol"].isin(symbols)].reset_index(drop=True)
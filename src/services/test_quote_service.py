@@ -0,0 +1,88 @@
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from brokers.quote_stream import QUOTE_DTYPE
+from core import QuoteModel
+from services.quote_service import QuoteCache
+from utils import RingBuffer
+
+
+class FakeBroker:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+
+    def get_quotes(self, symbols):
+        self.calls.append(sorted(symbols))
+        time.sleep(self.delay)
+        return [
+            QuoteModel(
+                symbol=s,
+                ts=datetime.now(),
+                last_done=1.0,
+                open=1.0,
+                high=1.0,
+                low=1.0,
+                prev_close=0.9,
+                volume=1,
+                turnover=1.0,
+            )
+            for s in symbols
+            if s != "UNKNOWN.US"
+        ]
+
+
+def _conf(ttl: float = 60):
+    return SimpleNamespace(realtime_cache_ttl=ttl)
+
+
+def test_concurrent_misses_share_one_batch():
+    broker = FakeBroker(delay=0.05)
+    cache = QuoteCache(broker, _conf(), batch_window=0.05)
+    symbols = [f"{i}.HK" for i in range(10)]
+    results = {}
+
+    def worker(symbol):
+        results[symbol] = cache.get([symbol, "0.HK"])
+
+    threads = [threading.Thread(target=worker, args=(s,)) for s in symbols]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert broker.calls == [sorted(symbols)]
+    assert all(s in df["symbol"].tolist() for s, df in results.items())
+    assert cache.stats["batches"] == 1
+
+
+def test_hits_within_ttl_and_unknown_symbols():
+    broker = FakeBroker()
+    cache = QuoteCache(broker, _conf(), batch_window=0)
+    df = cache.get(["700.HK", "UNKNOWN.US"])
+    assert df["symbol"].tolist() == ["700.HK"]
+    cache.get(["700.HK"])
+    assert broker.calls == [["700.HK", "UNKNOWN.US"]]
+    cache.invalidate(["700.HK"])
+    cache.get(["700.HK"])
+    assert broker.calls[-1] == ["700.HK"]
+
+
+def test_stream_rows_are_filled_once_and_expire():
+    broker = FakeBroker()
+    buf = RingBuffer(QUOTE_DTYPE, 8)
+    stream = SimpleNamespace(buffers={"quote": {"700.HK": buf}})
+    cache = QuoteCache(broker, _conf(ttl=0.2), stream, batch_window=0)
+
+    buf.append((1, 2.0, 1.0, 1.0, 1.0, 5, 1.0, 1, 1.0))
+    cache.get(["700.HK"])
+    assert len(broker.calls) == 1  # 推送没有昨收价, 先请求一次补全
+
+    buf.append((2, 3.0, 1.0, 1.0, 1.0, 5, 1.0, 1, 1.0))
+    df = cache.get(["700.HK"])
+    assert (df["last_done"].iloc[0], df["prev_close"].iloc[0]) == (3.0, 0.9)
+    assert len(broker.calls) == 1
+
+    time.sleep(0.25)  # 推送中断超过 ttl, 回退到请求
+    cache.get(["700.HK"])
+    assert len(broker.calls) == 2
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+import pandas as pd
+from core import SecurityStaticInfoModel
+from services.static_info_service import StaticInfoService
+
+
+class FakeBroker:
+    def __init__(self, returned):
+        self.returned = returned  # 请求的 symbol -> 券商返回的 symbol
+        self.calls = []
+
+    def get_stock_static_info(self, symbols):
+        self.calls.append(list(symbols))
+        return [
+            SecurityStaticInfoModel(
+                lot_size=100,
+                total_shares=1,
+                circulating_shares=1,
+                symbol=self.returned[s],
+                name=s,
+                exchange="SEHK",
+                currency="HKD",
+                eps=None,
+                eps_ttm=None,
+                bps=None,
+                dividend_yield=None,
+                stock_derivatives=None,
+                board=None,
+            )
+            for s in symbols
+            if s in self.returned
+        ]
+
+
+def _service(tmp_path, broker):
+    conf = SimpleNamespace(database_path=str(tmp_path / "t.db"), max_workers=1, static_info_max_age_hours=24)
+    return StaticInfoService(broker, conf)
+
+
+def test_sync_matches_normalized_symbols(tmp_path):
+    broker = FakeBroker({"700.HK": "00700.HK", "9988.HK": "9988.hk"})
+    service = _service(tmp_path, broker)
+    report = service.sync(["700.HK", "9988.HK", "1.HK"])
+    assert report["fetched"] == 2 and report["unknown"] == 1
+    df = service.load().set_index("symbol")
+    assert df.loc["700.HK", "name"] == "700.HK"
+    assert df.loc["9988.HK", "lot_size"] == 100
+    assert pd.isna(df.loc["1.HK", "name"])
+    assert service.stale(["700.HK", "9988.HK", "1.HK"]) == []
@@ -2,7 +2,17 @@ import asyncio
 import functools
 from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
 from .duckdb_manager import DuckDBManager
+from .async_duckdb_manager import AsyncDuckDBManager
+from .duckdb_schema import DuckDBSchema
 from .measures import AsyncTimer, ProgressBar, Timer, TimerDecorator
+from .http_cache import HttpCache
+from .page_fetcher import PageFetcher, PageFetchError
+from .parquet_lake import ParquetLake
+from .rate_limiter import RateLimiter, TokenBucket
+from .resilience import CircuitBreaker, CircuitOpenError, ResiliencePolicy
+from .ring_buffer import RingBuffer, RingCursor
+from .single_flight import SingleFlight
+from .source_registry import SourceRegistry
 
 
 class AsyncIteratorFactory:
@@ -47,6 +57,21 @@ __all__ = [
     "TimerDecorator",
     "ProgressBar",
     "DuckDBManager",
+    "AsyncDuckDBManager",
+    "DuckDBSchema",
+    "HttpCache",
+    "PageFetcher",
+    "PageFetchError",
+    "ParquetLake",
+    "RateLimiter",
+    "TokenBucket",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "ResiliencePolicy",
+    "RingBuffer",
+    "RingCursor",
+    "SingleFlight",
+    "SourceRegistry",
     "Timer",
     "AsyncTimer",
     "AsyncIteratorFactory",
@@ -0,0 +1,111 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Literal, Optional, Sequence, Union
+import pandas as pd
+import pyarrow as pa
+from .duckdb_manager import DuckDBManager
+
+
+class AsyncDuckDBManager:
+    """
+    DuckDBManager 的 asyncio 封装
+    - 所有调用都在专用的有界线程池中执行, 不阻塞事件循环
+    - 同一数据库的写操作按提交顺序串行执行, 读操作并发执行
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="duckdb")
+        self._write_locks: Dict[str, asyncio.Lock] = {}
+
+    async def __aenter__(self) -> "AsyncDuckDBManager":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """等待已提交的任务完成后关闭线程池"""
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, func: Callable[..., Any], *args: Any, **kw: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kw))
+
+    async def _write(self, db_path: str, func: Callable[..., Any], *args: Any, **kw: Any) -> Any:
+        lock = self._write_locks.setdefault(db_path, asyncio.Lock())
+        async with lock:
+            return await self._run(func, *args, **kw)
+
+    async def query_df(
+        self, sql: str, db_path: str = ":memory:", params: Optional[Union[tuple, dict]] = None
+    ) -> pd.DataFrame:
+        return await self._run(DuckDBManager.query_df, sql, db_path, params)
+
+    async def query_arrow(
+        self, sql: str, db_path: str = ":memory:", params: Optional[Union[tuple, dict]] = None
+    ) -> pa.Table:
+        return await self._run(DuckDBManager.query_arrow, sql, db_path, params)
+
+    async def execute(self, sql: str, db_path: str = ":memory:", params: Optional[Union[tuple, dict]] = None) -> None:
+        await self._write(db_path, DuckDBManager.execute, sql, db_path, params)
+
+    async def insert_df(
+        self,
+        table_name: str,
+        df: pd.DataFrame,
+        db_path: str = ":memory:",
+        if_exists: Literal["append", "replace", "fail"] = "append",
+    ) -> None:
+        await self._write(db_path, DuckDBManager.insert_df, table_name, df, db_path, if_exists)
+
+    async def insert_arrow(
+        self,
+        table_name: str,
+        data: Union[pa.Table, pa.RecordBatch, pa.RecordBatchReader],
+        db_path: str = ":memory:",
+        if_exists: Literal["append", "replace", "fail"] = "append",
+    ) -> None:
+        await self._write(db_path, DuckDBManager.insert_arrow, table_name, data, db_path, if_exists)
+
+    async def upsert_df(
+        self,
+        table_name: str,
+        df: pd.DataFrame,
+        key_columns: Sequence[str],
+        db_path: str = ":memory:",
+        scope: Optional[Dict[str, Sequence]] = None,
+        history_table: Optional[str] = None,
+    ) -> Dict[str, int]:
+        return await self._write(
+            db_path, DuckDBManager.upsert_df, table_name, df, key_columns, db_path, scope, history_table
+        )
+
+    async def iter_batches(
+        self,
+        sql: str,
+        db_path: str = ":memory:",
+        params: Optional[Union[tuple, dict]] = None,
+        batch_size: int = 100_000,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """
+        异步流式读取: 每取一个 batch 提交一次线程池, 内存中始终只有一个 batch
+        可配合 TimerDecorator.timer_async_yield 统计扫描耗时
+        """
+        generator = DuckDBManager.iter_batches(sql, db_path, params, batch_size)
+        pending = None
+        try:
+            while True:
+                pending = self._executor.submit(next, generator, None)
+                batch = await asyncio.wrap_future(pending)
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            if pending is None or pending.done():
+                generator.close()  # 只释放 cursor, 开销很小, 直接在当前线程执行
+            else:  # 协程被取消时 next 仍在线程池中执行, 生成器不能并发 close: 等它结束后在同一线程关闭
+                pending.add_done_callback(lambda _: generator.close())
+
+
+__all__ = ["AsyncDuckDBManager"]
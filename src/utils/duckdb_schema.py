@@ -0,0 +1,186 @@
+import threading
+from typing import Callable, List, Set, Tuple
+import duckdb
+from .duckdb_manager import DuckDBManager
+
+EXCHANGES = ("SH", "SZ", "HK", "US")
+BOARDS = ("A-shares", "STAR", "ChiNext", "Main", "GEM", "NYSE", "NASDAQ", "AMEX", "OTHER")
+
+
+def _v1_security_typed(conn: duckdb.DuckDBPyConnection) -> None:
+    """
+    SECURITY 改为强类型表:
+    - exchange/board 使用 ENUM(1 字节字典编码)
+    - code 限长 10 位, 与 ticker.region 的代码部分一致
+    - (exchange, code) 主键, 数据按 (exchange, code) 排序写入, 便于行组 zone map 过滤
+    旧表中 exchange 不合法的行(早期按位置追加导致的错列数据)直接丢弃
+    """
+    conn.execute(f"CREATE TYPE exchange_t AS ENUM ({', '.join(repr(x) for x in EXCHANGES)});")
+    conn.execute(f"CREATE TYPE board_t AS ENUM ({', '.join(repr(x) for x in BOARDS)});")
+    conn.execute("""
+        CREATE TABLE SECURITY_V1 (
+            exchange exchange_t NOT NULL,
+            code VARCHAR NOT NULL CHECK (length(code) <= 10),
+            name VARCHAR,
+            board board_t,
+            PRIMARY KEY (exchange, code)
+        );
+    """)
+    if DuckDBManager._table_exists(conn, "SECURITY"):
+        conn.execute(f"""
+            INSERT INTO SECURITY_V1
+            SELECT DISTINCT ON (exchange, code)
+                exchange,
+                code,
+                name,
+                CASE WHEN board IN ({', '.join(repr(x) for x in BOARDS)}) THEN board ELSE 'OTHER' END
+            FROM SECURITY
+            WHERE exchange IN ({', '.join(repr(x) for x in EXCHANGES)}) AND length(code) BETWEEN 1 AND 10
+            ORDER BY exchange, code;
+        """)
+        conn.execute("DROP TABLE SECURITY;")
+    conn.execute("ALTER TABLE SECURITY_V1 RENAME TO SECURITY;")
+
+
+def _v2_security_history(conn: duckdb.DuckDBPyConnection) -> None:
+    """
+    SECURITY_HISTORY: SECURITY 的拉链表, 由 upsert_df(history_table=...) 在刷新事务中追加
+    - 每行是一个版本, 有效期 [valid_from, valid_to), 当前版本 valid_to 为 NULL
+    - change_type: snapshot(迁移时的基线) / insert / update / delete, changed_columns 为 update 变化的列
+    - 按 valid_from 追加写入, 时点查询只需扫描 valid_from <= t 的行组; (exchange, code) 上建索引用于单只标的回溯
+    """
+    conn.execute("""
+        CREATE TABLE SECURITY_HISTORY (
+            exchange exchange_t NOT NULL,
+            code VARCHAR NOT NULL,
+            name VARCHAR,
+            board board_t,
+            change_type VARCHAR NOT NULL,
+            changed_columns VARCHAR[],
+            valid_from TIMESTAMP NOT NULL,
+            valid_to TIMESTAMP
+        );
+    """)
+    if DuckDBManager._table_exists(conn, "SECURITY"):
+        conn.execute("""
+            INSERT INTO SECURITY_HISTORY
+            SELECT exchange, code, name, board, 'snapshot', [], CAST(current_timestamp AS TIMESTAMP), NULL
+            FROM SECURITY ORDER BY exchange, code;
+        """)
+    conn.execute("CREATE INDEX security_history_key ON SECURITY_HISTORY (exchange, code);")
+    conn.execute("CREATE INDEX security_history_valid_from ON SECURITY_HISTORY (valid_from);")
+
+
+def _v3_static_info(conn: duckdb.DuckDBPyConnection) -> None:
+    """
+    STATIC_INFO: 券商返回的标的基本信息(每手数量/股本/EPS/BPS 等), 按 symbol 缓存
+    fetched_at 为最后一次拉取时间, 过期的行由 StaticInfoService 增量刷新;
+    券商没有返回的 symbol 也写入一行(除 fetched_at 外全为 NULL), 避免每次都重复请求
+    """
+    conn.execute("""
+        CREATE TABLE STATIC_INFO (
+            symbol VARCHAR PRIMARY KEY,
+            name VARCHAR,
+            exchange VARCHAR,
+            currency VARCHAR,
+            lot_size INTEGER,
+            total_shares BIGINT,
+            circulating_shares BIGINT,
+            eps DOUBLE,
+            eps_ttm DOUBLE,
+            bps DOUBLE,
+            dividend_yield DOUBLE,
+            stock_derivatives VARCHAR[],
+            board VARCHAR,
+            fetched_at TIMESTAMP NOT NULL
+        );
+    """)
+
+
+def _v4_source_stats(conn: duckdb.DuckDBPyConnection) -> None:
+    """
+    SOURCE_STATS: SourceRegistry 各数据源的近期表现(延迟/成功率的指数加权平均)
+    每次 fetch 后写入, 进程重启后加载, 排名不必从零开始试探
+    """
+    conn.execute("""
+        CREATE TABLE SOURCE_STATS (
+            registry VARCHAR,
+            source VARCHAR,
+            latency DOUBLE NOT NULL,
+            success_rate DOUBLE NOT NULL,
+            calls BIGINT NOT NULL,
+            failures BIGINT NOT NULL,
+            last_error VARCHAR,
+            updated_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (registry, source)
+        );
+    """)
+
+
+class DuckDBSchema:
+    """
+    版本化表结构迁移
+    已应用的版本记录在 SCHEMA_VERSION 表, 每个迁移在独立事务中执行
+    新增迁移只需在 MIGRATIONS 末尾追加 (版本号, 说明, 迁移函数)
+    """
+
+    MIGRATIONS: List[Tuple[int, str, Callable[[duckdb.DuckDBPyConnection], None]]] = [
+        (1, "SECURITY: ENUM exchange/board, (exchange, code) 主键并排序", _v1_security_typed),
+        (2, "SECURITY_HISTORY: 标的变化拉链表", _v2_security_history),
+        (3, "STATIC_INFO: 标的基本信息缓存", _v3_static_info),
+        (4, "SOURCE_STATS: 数据源近期表现", _v4_source_stats),
+    ]
+    _migrated: Set[str] = set()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def version(db_path: str = ":memory:") -> int:
+        """当前数据库的结构版本, 未初始化为 0"""
+        with DuckDBManager._get_connection(db_path) as conn:
+            return DuckDBSchema._version(conn)
+
+    @staticmethod
+    def _version(conn: duckdb.DuckDBPyConnection) -> int:
+        if not DuckDBManager._table_exists(conn, "SCHEMA_VERSION"):
+            return 0
+        return conn.execute("SELECT COALESCE(MAX(version), 0) FROM SCHEMA_VERSION;").fetchone()[0]
+
+    @staticmethod
+    def migrate(db_path: str = ":memory:") -> int:
+        """
+        依次执行尚未应用的迁移, 返回迁移后的版本号
+        同一进程内每个数据库只检查一次
+        """
+        with DuckDBSchema._lock:
+            with DuckDBManager._get_connection(db_path) as conn:
+                if db_path in DuckDBSchema._migrated:
+                    return DuckDBSchema._version(conn)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS SCHEMA_VERSION (
+                        version INTEGER PRIMARY KEY,
+                        description VARCHAR,
+                        applied_at TIMESTAMP DEFAULT current_timestamp
+                    );
+                """)
+                current = DuckDBSchema._version(conn)
+                for version, description, apply in DuckDBSchema.MIGRATIONS:
+                    if version <= current:
+                        continue
+                    conn.execute("BEGIN TRANSACTION;")
+                    try:
+                        apply(conn)
+                        conn.execute(
+                            "INSERT INTO SCHEMA_VERSION (version, description) VALUES (?, ?);",
+                            [version, description],
+                        )
+                        conn.execute("COMMIT;")
+                    except Exception:
+                        conn.execute("ROLLBACK;")
+                        raise
+                    current = version
+                    print(f"DuckDBSchema: {db_path} 迁移到 v{version} ({description})")
+                DuckDBSchema._migrated.add(db_path)
+                return current
+
+
+__all__ = ["DuckDBSchema", "EXCHANGES", "BOARDS"]
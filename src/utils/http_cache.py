@@ -0,0 +1,157 @@
+import glob
+import gzip
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+import pandas as pd
+import requests
+from .http_session import create_session
+from .rate_limiter import RateLimiter
+from .single_flight import SingleFlight
+
+# 多个线程同时请求同一份文件时只下载/解析一次
+_inflight = SingleFlight()
+
+
+def _parser_id(parse: Callable) -> str:
+    """解析函数的标识: 名称 + 字节码与常量的摘要, 修改函数体后旧的解析缓存自动失效"""
+    func = getattr(parse, "func", parse)  # functools.partial
+    h = hashlib.sha1(f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}".encode())
+    code = getattr(func, "__code__", None)
+    if code is not None:
+        h.update(code.co_code)
+        h.update(repr(code.co_consts).encode())
+    if func is not parse:
+        h.update(repr((parse.args, sorted(parse.keywords.items()))).encode())
+    return h.hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    content: bytes
+    sha256: str
+    from_cache: bool  # 服务端返回 304, 响应体取自本地副本
+
+
+class HttpCache:
+    """
+    本地 HTTP 响应缓存, 用于整份下载的交易所证券列表
+    - 请求时携带 If-None-Match / If-Modified-Since, 304 直接读本地副本
+    - 原始响应体 gzip 压缩保存在 root 下, 元数据(ETag/Last-Modified/sha256)另存 json
+    - get_frame 额外按 "内容 sha256 + 解析函数" 缓存解析后的 DataFrame(parquet),
+      内容未变时跳过解析; 服务端不支持条件请求时也能省掉解析
+    - 并发中的相同请求(同一 root/url/params)合并为一次
+    """
+
+    def __init__(self, root: str = "data/http_cache", timeout: float = 15):
+        self.root = root
+        self.timeout = timeout
+        self._local = threading.local()
+        os.makedirs(os.path.join(root, "frames"), exist_ok=True)
+
+    def session(self) -> requests.Session:
+        """当前线程的 keep-alive Session"""
+        s = getattr(self._local, "session", None)
+        if s is None:
+            s = self._local.session = create_session()
+        return s
+
+    @staticmethod
+    def _key(url: str, params: Optional[dict]) -> str:
+        raw = json.dumps([url, sorted((params or {}).items())], ensure_ascii=False)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _paths(self, key: str):
+        return os.path.join(self.root, f"{key}.json"), os.path.join(self.root, f"{key}.body.gz")
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _load(self, key: str):
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with gzip.open(body_path, "rb") as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None) -> CachedResponse:
+        """条件 GET: 本地有副本时先做再验证, 304 时不下载响应体"""
+        key = self._key(url, params)
+        return _inflight.do(("get", self.root, key), self._get, key, url, params, headers)
+
+    def _get(self, key: str, url: str, params: Optional[dict], headers: Optional[dict]) -> CachedResponse:
+        meta, body = self._load(key)
+        headers = dict(headers or {})
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        RateLimiter.get(f"http:{urlsplit(url).netloc}").acquire()
+        resp = self.session().get(url, params=params, headers=headers, timeout=self.timeout)
+        if resp.status_code == 304 and body is not None:
+            return CachedResponse(body, meta["sha256"], True)
+        resp.raise_for_status()
+        content = resp.content
+        digest = hashlib.sha256(content).hexdigest()
+        meta_path, body_path = self._paths(key)
+        if meta is None or meta.get("sha256") != digest:
+            self._write_atomic(body_path, gzip.compress(content))
+            if meta is not None:  # 内容已变, 旧内容的解析缓存不再需要
+                for old in glob.glob(os.path.join(self.root, "frames", f"{meta['sha256'][:16]}-*.parquet")):
+                    os.remove(old)
+        meta = {
+            "url": url,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "sha256": digest,
+        }
+        self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        return CachedResponse(content, digest, False)
+
+    def get_frame(
+        self,
+        url: str,
+        parse: Callable[[bytes], pd.DataFrame],
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+    ) -> pd.DataFrame:
+        """条件 GET 后用 parse 解析响应体, 同一内容同一解析函数(含函数体)只解析一次"""
+        parser = _parser_id(parse)
+        key = ("frame", self.root, self._key(url, params), parser)
+        return _inflight.do(key, self._get_frame, url, parse, parser, params, headers)
+
+    def _get_frame(
+        self,
+        url: str,
+        parse: Callable[[bytes], pd.DataFrame],
+        parser: str,
+        params: Optional[dict],
+        headers: Optional[dict],
+    ) -> pd.DataFrame:
+        resp = self.get(url, params, headers)
+        frame_path = os.path.join(self.root, "frames", f"{resp.sha256[:16]}-{parser[:8]}.parquet")
+        if os.path.exists(frame_path):
+            try:
+                return pd.read_parquet(frame_path)
+            except (OSError, ValueError):
+                pass  # 缓存文件损坏, 重新解析
+        df = parse(resp.content)
+        tmp = f"{frame_path}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, frame_path)
+        return df
+
+
+__all__ = ["HttpCache", "CachedResponse"]
@@ -0,0 +1,23 @@
+from typing import Callable, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+_adapter_factory: Optional[Callable[[int], HTTPAdapter]] = None
+
+
+def set_adapter_factory(factory: Optional[Callable[[int], HTTPAdapter]]) -> None:
+    """替换新建 Session 使用的传输层(录制/回放用), 传 None 恢复默认"""
+    global _adapter_factory
+    _adapter_factory = factory
+
+
+def create_session(pool_size: int = 4) -> requests.Session:
+    """
+    所有抓取代码共用的 Session 工厂, 连接池大小为 pool_size
+    已安装 adapter 工厂时挂载其返回的 adapter, 否则使用普通 HTTPAdapter
+    """
+    s = requests.Session()
+    adapter = _adapter_factory(pool_size) if _adapter_factory else HTTPAdapter(pool_size, pool_size)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
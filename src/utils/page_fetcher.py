@@ -0,0 +1,129 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+import requests
+from .http_session import create_session
+from .rate_limiter import RateLimiter
+from .resilience import CircuitOpenError, ResiliencePolicy
+from .single_flight import SingleFlight
+
+# 同一事件循环中同时请求同一页(url+params+解析函数)时只发一次
+_inflight = SingleFlight()
+
+
+class PageFetchError(Exception):
+    """分页抓取重试耗尽后仍失败"""
+
+
+class PageFetcher:
+    """
+    分页抓取引擎: asyncio 调度 + 线程本地 keep-alive Session
+    - concurrency: 同时在途的请求总数上限(一般取 Config.max_workers)
+    - per_host: 单个主机同时在途的请求上限
+    - 每个主机按 RateLimiter 的 http:<host> 令牌桶限速
+    - 每页按 policy 独立重试(抖动指数退避), 每个主机一个熔断器
+    - 重试耗尽或主机熔断时抛出 PageFetchError, 由调用方决定如何处理
+    - 并发中的相同请求合并为一次, 共享结果
+    须在 async with PageFetcher(...) 中使用(进入时创建线程池, 退出时关闭)
+    每个工作线程持有自己的 Session(避免 Session 跨线程共享), 连接在多次请求间复用
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        per_host: int = 4,
+        policy: Optional[ResiliencePolicy] = None,
+        timeout: float = 15,
+    ):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.policy = policy or ResiliencePolicy()
+        self.timeout = timeout
+        self._local = threading.local()
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._limit: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def session(self) -> requests.Session:
+        """当前线程的 keep-alive Session"""
+        s = getattr(self._local, "session", None)
+        if s is None:
+            s = self._local.session = create_session(self.per_host)
+        return s
+
+    def _get(
+        self,
+        url: str,
+        params: Optional[dict],
+        headers: Optional[dict],
+        parse: Callable[[requests.Response], Any],
+    ) -> Any:
+        resp = self.session().get(url, params=params, headers=headers, timeout=self.timeout)
+        resp.raise_for_status()
+        return parse(resp)
+
+    async def fetch(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        parse: Callable[[requests.Response], Any] = lambda r: r.json(),
+    ) -> Any:
+        """抓取单页并解析, 失败按 policy 重试"""
+        if self._executor is None:
+            raise RuntimeError(
+                "PageFetcher 未打开, 请在 async with PageFetcher(...) as fetcher: 中调用 fetch/fetch_all"
+            )
+        # 解析函数按名称区分: 每次调用都会新建的嵌套函数也能合并
+        key = (url, tuple(sorted((params or {}).items())), f"{parse.__module__}.{parse.__qualname__}")
+        return await _inflight.do_async(key, self._fetch, url, params, headers, parse)
+
+    async def _fetch(
+        self,
+        url: str,
+        params: Optional[dict],
+        headers: Optional[dict],
+        parse: Callable[[requests.Response], Any],
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        netloc = urlsplit(url).netloc
+        host = self._host_limits.setdefault(netloc, asyncio.Semaphore(self.per_host))
+        bucket = RateLimiter.get(f"http:{netloc}")
+
+        async def once() -> Any:
+            await bucket.acquire_async()
+            async with host, self._limit:
+                return await loop.run_in_executor(
+                    self._executor, functools.partial(self._get, url, params, headers, parse)
+                )
+
+        try:
+            return await self.policy.call_async(netloc, once)
+        except (CircuitOpenError, *ResiliencePolicy.RETRY_ON) as e:
+            raise PageFetchError(f"{url} {params} 抓取失败: {e}") from e
+
+    async def fetch_all(
+        self,
+        url: str,
+        pages: Sequence[dict],
+        headers: Optional[dict] = None,
+        parse: Callable[[requests.Response], Any] = lambda r: r.json(),
+    ) -> List[Any]:
+        """并发抓取同一 url 的多页(每页一组 params), 结果按 pages 顺序返回"""
+        return await asyncio.gather(*(self.fetch(url, p, headers, parse) for p in pages))
+
+    async def __aenter__(self) -> "PageFetcher":
+        self._limit = asyncio.Semaphore(self.concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="page")
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._limit = None
+        self._host_limits.clear()
+
+
+__all__ = ["PageFetcher", "PageFetchError"]
@@ -0,0 +1,150 @@
+import glob
+import os
+from datetime import datetime
+from typing import Optional, Sequence, Union
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from .duckdb_manager import DuckDBManager
+
+
+class ParquetLake:
+    """
+    Hive 分区的 OHLCV 历史行情库
+    目录结构: <root>/exchange=HK/symbol=700.HK/year=2025/part-<uuidv7>.parquet
+    - symbol 使用 ticker.region 格式, exchange 取自 symbol 后缀
+    - 写入只追加新文件, 小文件由 compact 合并
+    - 读取时按 exchange/symbol/year 直接定位分区目录, 时间条件下推到 Parquet 行组统计
+    """
+
+    PARTITION_BY = ("exchange", "symbol", "year")
+    # 与 CandlestickModel 对应的列, 读取不到数据时按此返回空表
+    SCHEMA = pa.schema(
+        [
+            ("symbol", pa.string()),
+            ("period", pa.string()),
+            ("ts", pa.timestamp("us")),
+            ("open", pa.float64()),
+            ("high", pa.float64()),
+            ("low", pa.float64()),
+            ("close", pa.float64()),
+            ("volume", pa.int64()),
+            ("turnover", pa.float64()),
+            ("exchange", pa.string()),
+            ("year", pa.int32()),
+        ]
+    )
+    HIVE_TYPES = "{'exchange': VARCHAR, 'symbol': VARCHAR, 'year': INTEGER}"
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def append(self, bars: Union[pd.DataFrame, pa.Table]) -> int:
+        """
+        追加 K 线数据, bars 至少包含 symbol, ts(时间戳) 两列, 其余列原样写入
+        返回写入行数
+        """
+        table = bars if isinstance(bars, pa.Table) else pa.Table.from_pandas(bars, preserve_index=False)
+        if table.num_rows == 0:
+            return 0
+        exchange = pc.list_element(pc.split_pattern(table["symbol"], ".", max_splits=1, reverse=True), 1)
+        table = table.append_column("exchange", exchange).append_column(
+            "year", pc.cast(pc.year(table["ts"]), pa.int32())
+        )
+        DuckDBManager.export_to_parquet(
+            "__lake_batch",
+            self.root,
+            partition_by=self.PARTITION_BY,
+            append=True,
+            data=table,
+        )
+        return table.num_rows
+
+    def _partition_glob(
+        self,
+        exchange: Optional[str] = None,
+        symbol: Optional[str] = None,
+        year: Optional[int] = None,
+    ) -> str:
+        if symbol and not exchange:
+            exchange = symbol.rsplit(".", 1)[-1]
+        parts = [
+            f"exchange={exchange}" if exchange else "*",
+            f"symbol={symbol}" if symbol else "*",
+            f"year={year}" if year else "*",
+        ]
+        return os.path.join(self.root, *parts, "*.parquet")
+
+    def read(
+        self,
+        symbol: Optional[str] = None,
+        exchange: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> pa.Table:
+        """
+        读取 K 线, 返回按 ts 排序的 Arrow Table
+        - symbol/exchange 用于定位分区目录, start/end 同年时只读取该年分区
+        - start/end 作为 ts 过滤条件下推
+        """
+        year = start.year if start and end and start.year == end.year else None
+        path = self._partition_glob(exchange, symbol, year)
+        if not glob.glob(path):
+            empty = self.SCHEMA.empty_table()
+            return empty.select(list(columns)) if columns else empty
+        where, params = [], []
+        if start:
+            where.append("ts >= ?")
+            params.append(start)
+            where.append("year >= ?")
+            params.append(start.year)
+        if end:
+            where.append("ts <= ?")
+            params.append(end)
+            where.append("year <= ?")
+            params.append(end.year)
+        return DuckDBManager.query_arrow(
+            f"""
+            SELECT {", ".join(columns) if columns else "*"}
+            FROM read_parquet('{path}', hive_partitioning = true, hive_types = {self.HIVE_TYPES})
+            {f"WHERE {' AND '.join(where)}" if where else ""}
+            ORDER BY ts;
+            """,
+            params=params or None,
+        )
+
+    def compact(self, min_files: int = 2, key_columns: Sequence[str] = ("period", "ts")) -> int:
+        """
+        合并小文件: 分区内文件数 >= min_files 时重写为单个按 ts 排序的文件
+        同一 key_columns 重复的行保留最后写入的一条, 返回被合并的分区数
+        """
+        compacted = 0
+        for partition in sorted(glob.glob(self._partition_glob().rsplit(os.sep, 1)[0])):
+            files = sorted(glob.glob(os.path.join(partition, "*.parquet")))
+            if len(files) < min_files:
+                continue
+            target = files[-1]  # 沿用最新文件名(uuidv7 按时间有序), 保证之后追加的文件仍排在其后
+            keys = ", ".join(key_columns)
+            with DuckDBManager._get_connection(":memory:") as conn:
+                conn.execute(
+                    f"""
+                    COPY (
+                        SELECT * EXCLUDE (filename)
+                        FROM read_parquet(?, filename = true, hive_partitioning = false)
+                        QUALIFY row_number() OVER (PARTITION BY {keys} ORDER BY filename DESC) = 1
+                        ORDER BY ts
+                    ) TO '{target}.tmp' (FORMAT PARQUET);
+                    """,
+                    [files],
+                )
+            # 先替换再删除: 中途中断时旧文件仍在, 最多出现重复行(下次 compact 去重), 不会丢数据
+            os.replace(f"{target}.tmp", target)
+            for f in files[:-1]:
+                os.remove(f)
+            compacted += 1
+        return compacted
+
+
+__all__ = ["ParquetLake"]
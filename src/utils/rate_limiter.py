@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class TokenBucket:
+    """
+    令牌桶: 以 rate 个/秒补充令牌, 最多积攒 burst 个
+    - 令牌不足时按到达顺序预约未来的令牌(余额可为负), 并发调用方自动排队, 不会同时醒来争抢
+    - acquire / acquire_async 返回实际等待的秒数, 累计等待时间记入 stats
+    rate 为 None 表示不限速
+    """
+
+    def __init__(self, name: str, rate: Optional[float] = None, burst: int = 1):
+        self.name = name
+        self._lock = threading.Lock()
+        self.configure(rate, burst)
+        self.acquired = 0
+        self.waited = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def configure(self, rate: Optional[float], burst: int = 1) -> None:
+        with self._lock:
+            self.rate = rate
+            self.burst = max(1, burst)
+            self._tokens = float(self.burst)
+            self._updated = time.monotonic()
+
+    def _reserve(self, tokens: int) -> float:
+        """扣除令牌并返回需要等待的秒数"""
+        with self._lock:
+            self.acquired += tokens
+            if not self.rate:
+                return 0.0
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if wait > 0:
+                self.waited += 1
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+            return wait
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """不等待: 令牌足够时扣除并返回 True"""
+        with self._lock:
+            if not self.rate:
+                self.acquired += tokens
+                return True
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            self.acquired += tokens
+            return True
+
+    def acquire(self, tokens: int = 1) -> float:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int = 1) -> float:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "rate": self.rate,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "wait_total": round(self.wait_total, 3),
+            "wait_avg": round(self.wait_total / self.waited, 3) if self.waited else 0.0,
+            "wait_max": round(self.wait_max, 3),
+        }
+
+
+class RateLimiter:
+    """
+    进程内按上游命名的令牌桶注册表
+    - longport:quote   长桥行情接口(K线/静态信息/报价共用), longport_quote_qps
+    - http:<host>      交易所/行情网站, 每个主机一个桶, 默认取 http:* 的设置(http_host_qps)
+    - akshare / gemini / bot  对应 Config 中原有的间隔与窗口设置
+    未配置的名称不限速
+    """
+
+    _buckets: Dict[str, TokenBucket] = {}
+    _defaults: Dict[str, tuple] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, name: str, rate: Optional[float], burst: int = 1) -> None:
+        """设置(或更新)桶参数; 名称以 :* 结尾时作为该前缀下各桶的默认参数"""
+        with cls._lock:
+            if name.endswith(":*"):
+                prefix = name[:-1]
+                cls._defaults[prefix] = (rate, burst)
+                targets = [b for n, b in cls._buckets.items() if n.startswith(prefix)]
+            else:
+                if name not in cls._buckets:
+                    cls._buckets[name] = TokenBucket(name, rate, burst)
+                targets = [cls._buckets[name]]
+            for bucket in targets:
+                if (bucket.rate, bucket.burst) != (rate, max(1, burst)):
+                    bucket.configure(rate, burst)
+
+    @classmethod
+    def configure_from(cls, conf) -> None:
+        """按 Config 注册各上游的桶, 可重复调用"""
+        cls.configure("longport:quote", conf.longport_quote_qps, burst=conf.longport_quote_qps)
+        cls.configure("http:*", conf.http_host_qps, burst=conf.http_per_host)
+        # 间隔/窗口为 0 表示不限速
+        akshare_sleep = conf.akshare_sleep_min + conf.akshare_sleep_max
+        cls.configure("akshare", 2 / akshare_sleep if akshare_sleep > 0 else None)
+        cls.configure("gemini", 1 / conf.gemini_request_delay if conf.gemini_request_delay > 0 else None)
+        cls.configure(
+            "bot",
+            conf.bot_rate_limit_requests / conf.bot_rate_limit_window if conf.bot_rate_limit_window > 0 else None,
+            burst=conf.bot_rate_limit_requests,
+        )
+
+    @classmethod
+    def get(cls, name: str) -> TokenBucket:
+        with cls._lock:
+            bucket = cls._buckets.get(name)
+            if bucket is None:
+                prefix = name[: name.find(":") + 1] if ":" in name else None
+                rate, burst = cls._defaults.get(prefix, (None, 1))
+                bucket = cls._buckets[name] = TokenBucket(name, rate, burst)
+            return bucket
+
+    @classmethod
+    def stats(cls) -> List[dict]:
+        with cls._lock:
+            buckets = list(cls._buckets.values())
+        return [b.stats for b in buckets]
+
+    @classmethod
+    def print_stats(cls) -> None:
+        for s in cls.stats():
+            if s["acquired"]:
+                rate = f"{s['rate']:g}/s" if s["rate"] else "不限速"
+                print(
+                    f"RateLimiter: {s['name']:<24} {rate:>8} 请求 {s['acquired']} 次, "
+                    f"等待 {s['waited']} 次 共 {s['wait_total']}s 最长 {s['wait_max']}s"
+                )
+
+
+__all__ = ["RateLimiter", "TokenBucket"]
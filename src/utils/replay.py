@@ -0,0 +1,278 @@
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from .http_session import set_adapter_factory
+from .rate_limiter import TokenBucket
+
+# 回放时不转发的响应头: 正文已解压/重新计算长度
+_SKIP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+
+def _key(method: str, url: str) -> str:
+    return hashlib.sha1(f"{method} {url}".encode()).hexdigest()
+
+
+class Cassette:
+    """录制的响应, 每个请求一个 <key>.json(状态码/响应头) + <key>.body.gz"""
+
+    def __init__(self, root: str = "data/replay"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def save(self, method: str, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        key = _key(method, url)
+        headers = {k: v for k, v in headers.items() if k.lower() not in _SKIP_HEADERS}
+        with gzip.open(os.path.join(self.root, f"{key}.body.gz"), "wb") as f:
+            f.write(body)
+        with open(os.path.join(self.root, f"{key}.json"), "w", encoding="utf-8") as f:
+            json.dump({"method": method, "url": url, "status": status, "headers": headers}, f, ensure_ascii=False)
+
+    def load(self, method: str, url: str) -> Optional[Tuple[dict, bytes]]:
+        key = _key(method, url)
+        try:
+            with open(os.path.join(self.root, f"{key}.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            with gzip.open(os.path.join(self.root, f"{key}.body.gz"), "rb") as f:
+                return meta, f.read()
+        except OSError:
+            return None
+
+
+class RecordingAdapter(HTTPAdapter):
+    """正常访问线上站点, 同时把每个成功响应写入 Cassette"""
+
+    def __init__(self, cassette: Cassette, pool_size: int = 4):
+        super().__init__(pool_size, pool_size)
+        self.cassette = cassette
+
+    def send(self, request, **kw):
+        resp = super().send(request, **kw)
+        if resp.status_code < 400:
+            self.cassette.save(request.method, request.url, resp.status_code, dict(resp.headers), resp.content)
+        return resp
+
+
+class ReplayAdapter(HTTPAdapter):
+    """把请求改写到本地替身服务器: https://host/path?q -> http://127.0.0.1:port/https/host/path?q"""
+
+    def __init__(self, base_url: str, pool_size: int = 4):
+        super().__init__(pool_size, pool_size)
+        self.base_url = base_url
+
+    def send(self, request, **kw):
+        original = request.url
+        parts = urlsplit(original)
+        request.url = f"{self.base_url}/{parts.scheme}/{parts.netloc}{parts.path}" + (
+            f"?{parts.query}" if parts.query else ""
+        )
+        resp = super().send(request, **kw)
+        request.url = resp.url = original
+        return resp
+
+
+class StandInServer:
+    """
+    本地替身服务器, 按录制内容回放
+    - latency: 每个请求额外延迟(秒), 实际延迟在 [0.5, 1.5] 倍之间抖动
+    - error_rate: 返回 503 的概率
+    - host_qps: 单个主机每秒请求上限, 超出返回 429(模拟限流封禁), None 不限
+    - 支持 If-None-Match / If-Modified-Since, 与录制的 ETag/Last-Modified 相同时返回 304
+    stats 按主机统计请求数与响应字节数
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        host_qps: Optional[float] = None,
+    ):
+        self.cassette = cassette
+        self.latency = latency
+        self.error_rate = error_rate
+        self.host_qps = host_qps
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def _count(self, host: str, field: str, n: int = 1) -> None:
+        with self._lock:
+            s = self.stats.setdefault(host, {"requests": 0, "bytes": 0, "errors": 0, "throttled": 0, "missing": 0})
+            s[field] += n
+
+    def _admit(self, host: str) -> Optional[int]:
+        """按设定返回需要模拟的错误状态码"""
+        if self.latency:
+            time.sleep(self.latency * random.uniform(0.5, 1.5))
+        if self.host_qps:
+            with self._lock:
+                bucket = self._buckets.setdefault(host, TokenBucket(host, self.host_qps, max(1, int(self.host_qps))))
+            if not bucket.try_acquire():
+                self._count(host, "throttled")
+                return 429
+        if self.error_rate and random.random() < self.error_rate:
+            self._count(host, "errors")
+            return 503
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status: int, headers: Dict[str, str], body: bytes = b"") -> None:
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                scheme, _, rest = self.path.lstrip("/").partition("/")
+                host = rest.split("/", 1)[0].split("?", 1)[0]
+                status = server._admit(host)
+                if status:
+                    return self._reply(status, {"Retry-After": "1"})
+                recorded = server.cassette.load("GET", f"{scheme}://{rest}")
+                if recorded is None:
+                    server._count(host, "missing")
+                    return self._reply(404, {"Content-Type": "text/plain"}, b"not recorded")
+                meta, body = recorded
+                headers = {k.lower(): v for k, v in meta["headers"].items()}
+                etag, modified = headers.get("etag"), headers.get("last-modified")
+                if (etag and self.headers.get("If-None-Match") == etag) or (
+                    modified and self.headers.get("If-Modified-Since") == modified
+                ):
+                    server._count(host, "requests")
+                    return self._reply(
+                        304, {k: v for k, v in meta["headers"].items() if k.lower() in ("etag", "last-modified")}
+                    )
+                server._count(host, "requests")
+                server._count(host, "bytes", len(body))
+                self._reply(meta["status"], meta["headers"], body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats.clear()
+
+    def __enter__(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stand-in", daemon=True)
+        self._thread.start()
+        set_adapter_factory(lambda pool_size: ReplayAdapter(self.base_url, pool_size))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        set_adapter_factory(None)
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class Recorder:
+    """录制模式: with 块内新建的 Session 访问线上站点并保存响应"""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def __enter__(self) -> "Recorder":
+        set_adapter_factory(lambda pool_size: RecordingAdapter(self.cassette, pool_size))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        set_adapter_factory(None)
+
+
+if __name__ == "__main__":
+    # 录制一次线上响应, 之后完全离线地回放与压测:
+    # python -m utils.replay record
+    # python -m utils.replay bench --latency 0.05 --error-rate 0.02 --host-qps 20
+    import argparse
+    import dataclasses
+    import tempfile
+    from config import get_config
+    from markets import CNMarket, HKMarket, USMarket
+    from services import RefreshService
+    from utils import CircuitBreaker, DuckDBManager
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=["record", "bench"])
+    parser.add_argument("--root", default="data/replay")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--host-qps", type=float, default=None)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="replay-")
+    conf = dataclasses.replace(
+        get_config(),
+        database_path=os.path.join(workdir, "bench.duckdb"),
+        database_read_only=False,
+        http_cache_dir=os.path.join(workdir, "http_cache"),  # 空缓存, 每个请求都完整下载
+    )
+    cassette = Cassette(args.root)
+
+    def registries(market):
+        return list(market.sources.values()) if isinstance(market.sources, dict) else [market.sources]
+
+    def each_source(market):
+        for registry in registries(market):
+            for source in registry.sources:
+                yield registry, source
+
+    markets = [CNMarket(conf), HKMarket(conf), USMarket(conf)]
+    if args.mode == "record":
+        with Recorder(cassette):
+            for market in markets:
+                for registry, source in each_source(market):
+                    try:
+                        rows = len(registry.call(source))
+                        print(f"record: {registry.name:<14} {source:<10} {rows} 行")
+                    except Exception as e:
+                        print(f"record: {registry.name:<14} {source:<10} 失败: {e}")
+    else:
+        with StandInServer(cassette, args.latency, args.error_rate, args.host_qps) as server:
+            print(f"{'registry':<14} {'source':<10} {'行数':>6} {'页数':>5} {'耗时s':>7} {'页/s':>7} {'KB/s':>9}")
+            for market in markets:
+                for registry, source in each_source(market):
+                    server.reset_stats()
+                    CircuitBreaker._registry.clear()
+                    start = time.perf_counter()
+                    try:
+                        rows = len(registry.call(source))
+                    except Exception as e:
+                        print(f"{registry.name:<14} {source:<10} 失败: {e}")
+                        continue
+                    elapsed = time.perf_counter() - start
+                    pages = sum(s["requests"] for s in server.stats.values())
+                    size = sum(s["bytes"] for s in server.stats.values())
+                    print(
+                        f"{registry.name:<14} {source:<10} {rows:>6} {pages:>5} {elapsed:>7.2f} "
+                        f"{pages / elapsed:>7.1f} {size / 1024 / elapsed:>9.1f}"
+                    )
+            # 端到端: 三个市场并行刷新并写库
+            CircuitBreaker._registry.clear()
+            server.reset_stats()
+            RefreshService(conf, markets).refresh()
+            print(f"stand-in: {server.stats}")
+        DuckDBManager.close()
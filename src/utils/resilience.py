@@ -0,0 +1,135 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple, Type
+import requests
+
+
+class CircuitOpenError(Exception):
+    """数据源处于熔断状态, 调用被直接拒绝"""
+
+
+class CircuitBreaker:
+    """
+    按数据源熔断: 连续失败 failure_threshold 次后熔断 cooldown 秒,
+    冷却期内的调用直接抛出 CircuitOpenError, 冷却结束后放行一次试探(半开), 成功即恢复
+    同名数据源在进程内共享同一个熔断器
+    """
+
+    _registry: Dict[str, "CircuitBreaker"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, name: str, cooldown: float = 300, failure_threshold: int = 3):
+        self.name = name
+        self.cooldown = cooldown
+        self.failure_threshold = failure_threshold
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, name: str, cooldown: float = 300, failure_threshold: int = 3) -> "CircuitBreaker":
+        with cls._registry_lock:
+            if name not in cls._registry:
+                cls._registry[name] = cls(name, cooldown, failure_threshold)
+            return cls._registry[name]
+
+    @property
+    def is_open(self) -> bool:
+        return self.failures >= self.failure_threshold and time.monotonic() - self.opened_at < self.cooldown
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.is_open:
+                remaining = self.cooldown - (time.monotonic() - self.opened_at)
+                raise CircuitOpenError(f"{self.name} 熔断中, {remaining:.0f}秒后重试")
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()  # 半开: 只放行这一次, 其余调用继续拒绝
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class ResiliencePolicy:
+    """
+    重试 + 熔断策略, 参数取自 Config:
+    max_retries / retry_base_delay / retry_max_delay / circuit_breaker_cooldown
+    - 重试间隔为带全抖动的指数退避: uniform(0, min(max_delay, base_delay * 2^n))
+    - 熔断器按 source 名称区分, 熔断中的数据源不再重试, 立即失败
+    - 任何异常都计入熔断器; 只有 RETRY_ON 中的异常才重试. 下层已重试过的错误(如 PageFetchError)
+      不在其中, 避免页级与数据源级重试次数相乘
+    """
+
+    RETRY_ON: Tuple[Type[BaseException], ...] = (requests.RequestException, ValueError, KeyError)
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        cooldown: float = 300,
+        failure_threshold: int = 3,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cooldown = cooldown
+        self.failure_threshold = failure_threshold
+
+    @classmethod
+    def from_config(cls, conf) -> "ResiliencePolicy":
+        return cls(
+            max_retries=conf.max_retries,
+            base_delay=conf.retry_base_delay,
+            max_delay=conf.retry_max_delay,
+            cooldown=conf.circuit_breaker_cooldown,
+        )
+
+    def breaker(self, source: str) -> CircuitBreaker:
+        return CircuitBreaker.get(source, self.cooldown, self.failure_threshold)
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def call(self, source: str, func: Callable[..., Any], *args: Any, **kw: Any) -> Any:
+        """在 source 的熔断器保护下调用 func, 失败按退避重试"""
+        breaker = self.breaker(source)
+        for attempt in range(self.max_retries + 1):
+            breaker.before_call()
+            try:
+                result = func(*args, **kw)
+            except Exception as e:
+                breaker.record_failure()
+                if not isinstance(e, self.RETRY_ON) or attempt == self.max_retries or breaker.is_open:
+                    raise
+                time.sleep(self.backoff(attempt))
+            else:
+                breaker.record_success()
+                return result
+
+    async def call_async(self, source: str, func: Callable[..., Awaitable[Any]], *args: Any, **kw: Any) -> Any:
+        """call 的异步版本, func 为协程函数"""
+        breaker = self.breaker(source)
+        for attempt in range(self.max_retries + 1):
+            breaker.before_call()
+            try:
+                result = await func(*args, **kw)
+            except Exception as e:
+                breaker.record_failure()
+                if not isinstance(e, self.RETRY_ON) or attempt == self.max_retries or breaker.is_open:
+                    raise
+                await asyncio.sleep(self.backoff(attempt))
+            else:
+                breaker.record_success()
+                return result
+
+
+__all__ = ["CircuitBreaker", "CircuitOpenError", "ResiliencePolicy"]
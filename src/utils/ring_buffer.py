@@ -0,0 +1,77 @@
+from typing import List, Optional
+import numpy as np
+
+
+class RingBuffer:
+    """
+    定长环形缓冲区, 底层为预分配的 numpy 结构化数组(每行一个 dtype 记录)
+    - 单写者: append 只做一次数组元素赋值和序号自增, O(1), 写入预分配的数组, 不扩容
+    - 多读者: 各自持有 RingCursor, 读取返回数组切片视图(不复制)
+    写入序号 seq 单调递增, 行位置为 seq % capacity; 读者落后超过 capacity 时旧行已被覆盖
+    """
+
+    def __init__(self, dtype, capacity: int):
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=self.dtype)
+        self.seq = 0  # 已写入的总行数
+
+    def append(self, row: tuple) -> None:
+        self._data[self.seq % self.capacity] = row
+        self.seq += 1  # 先写数据再发布序号, 读者看到的序号之前的行都已完整写入
+
+    def views(self, start: int, end: int) -> List[np.ndarray]:
+        """序号 [start, end) 的行, 跨越数组末尾时为两段视图; 调用方保证 end - start <= capacity"""
+        if end <= start:
+            return []
+        i, j = start % self.capacity, end % self.capacity
+        if i < j:
+            return [self._data[i:j]]
+        return [v for v in (self._data[i:], self._data[:j]) if len(v)]
+
+    def latest(self, n: int = 1) -> List[np.ndarray]:
+        """最近 n 行(不超过 capacity)"""
+        end = self.seq
+        return self.views(max(end - n, end - self.capacity, 0), end)
+
+    def last(self) -> Optional[np.void]:
+        """最新一行, 没有数据时为 None"""
+        return self._data[(self.seq - 1) % self.capacity] if self.seq else None
+
+    def cursor(self, from_start: bool = False) -> "RingCursor":
+        """新的读者, 默认只读取此后写入的行; from_start 时从仍保留的最早一行开始"""
+        return RingCursor(self, max(self.seq - self.capacity, 0) if from_start else self.seq)
+
+    def __len__(self) -> int:
+        return min(self.seq, self.capacity)
+
+
+class RingCursor:
+    """
+    RingBuffer 的读者, 记录已读到的序号
+    read 返回的视图直接指向缓冲区, 在写者绕回覆盖前有效; 需要长期保存时由调用方 copy
+    """
+
+    def __init__(self, buffer: RingBuffer, seq: int):
+        self.buffer = buffer
+        self.seq = seq
+        self.dropped = 0  # 读取不及时、被覆盖而丢失的行数
+
+    @property
+    def pending(self) -> int:
+        return self.buffer.seq - self.seq
+
+    def read(self, limit: Optional[int] = None) -> List[np.ndarray]:
+        """读取上次之后写入的行(至多 limit 行), 返回至多两段视图"""
+        end = self.buffer.seq
+        start = self.seq
+        if end - start > self.buffer.capacity:
+            self.dropped += end - start - self.buffer.capacity
+            start = end - self.buffer.capacity
+        if limit is not None:
+            end = min(end, start + limit)
+        self.seq = end
+        return self.buffer.views(start, end)
+
+
+__all__ = ["RingBuffer", "RingCursor"]
@@ -0,0 +1,100 @@
+import asyncio
+import functools
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class _AsyncCall:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    合并并发中的相同调用: 同一 key 同时只有一个调用真正执行, 其余调用等待并共享其结果(或异常)
+    调用结束后立即释放 key, 不做结果缓存, 之后的调用会重新执行
+    - do: 线程间合并
+    - do_async: 同一事件循环内的协程间合并
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Tuple[int, Hashable], _AsyncCall] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any, **kw: Any) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args, **kw)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any, **kw: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            call = self._futures.get(flight_key)
+            if call is None:
+                # 调用在独立 task 中执行, 任一等待者(包括发起者)被取消都不影响其他等待者
+                call = self._futures[flight_key] = _AsyncCall(loop.create_task(func(*args, **kw)))
+                call.task.add_done_callback(functools.partial(self._release, flight_key, call))
+                self.executed += 1
+            else:
+                self.shared += 1
+            call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            with self._lock:
+                call.waiters -= 1
+                abandoned = call.waiters == 0 and not call.task.done()
+            if abandoned:  # 所有等待者都已取消, 不再需要结果
+                call.task.cancel()
+
+    def _release(self, flight_key: Tuple[int, Hashable], call: _AsyncCall, task: "asyncio.Task") -> None:
+        with self._lock:
+            if self._futures.get(flight_key) is call:
+                del self._futures[flight_key]
+        if not task.cancelled():
+            task.exception()  # 没有等待者时避免 "exception was never retrieved" 警告
+
+    @property
+    def stats(self) -> dict:
+        return {"executed": self.executed, "shared": self.shared}
+
+
+__all__ = ["SingleFlight"]
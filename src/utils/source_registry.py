@@ -0,0 +1,196 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence
+import pandas as pd
+from .duckdb_manager import DuckDBManager
+from .resilience import CircuitBreaker, CircuitOpenError, ResiliencePolicy
+
+
+@dataclass
+class SourceStats:
+    latency: float = 0.0  # 成功调用耗时的指数加权平均(秒)
+    success_rate: float = 1.0  # 成功率的指数加权平均
+    calls: int = 0
+    failures: int = 0
+    last_error: Optional[str] = None
+
+
+class SourceRegistry:
+    """
+    同一份数据的多个数据源, 按 priority 与近期表现排序后调用
+    - 排序: 熔断中的排最后; 其余按 priority 顺序, 熔断器闭合时始终先用 priority 靠前的数据源
+      (不同数据源的名称写法与覆盖范围不同, 频繁切换会写出大量虚假变化);
+      priority 中没有的按 latency / success_rate 升序, 没有成功记录的排在最后
+    - fallback: 按排名依次调用, 返回第一个成功的结果(只有前面的失败时才会用到备用数据源)
+    - race: 排名前 race_width 个同时调用, 取最先成功的结果, 其余结果丢弃(耗时仍计入统计)
+    每个数据源在 policy 的熔断器(默认与数据源同名, register 时可指定)保护下调用, 失败按退避重试
+    传入 db_path 时统计持久化到 SOURCE_STATS 表: 首次 fetch 前加载; 写回由调用方在写库线程中执行 save
+    """
+
+    TABLE = "SOURCE_STATS"
+
+    def __init__(
+        self,
+        name: str,
+        policy: ResiliencePolicy,
+        priority: Sequence[str] = (),
+        mode: Literal["fallback", "race"] = "fallback",
+        race_width: int = 2,
+        alpha: float = 0.3,
+        db_path: Optional[str] = None,
+    ):
+        self.name = name
+        self.policy = policy
+        self.priority = list(priority)
+        self.mode = mode
+        self.race_width = race_width
+        self.alpha = alpha
+        self._sources: Dict[str, Callable[[], Any]] = {}
+        self._breakers: Dict[str, str] = {}
+        self._stats: Dict[str, SourceStats] = {}
+        self._lock = threading.Lock()
+        self.db_path = db_path
+        self._loaded = db_path is None
+
+    def register(self, source: str, func: Callable[[], Any], breaker: Optional[str] = None) -> "SourceRegistry":
+        """
+        breaker: 熔断器名称, 默认为 source;
+        同一数据源服务多个交易所时按交易所区分(如 eastmoney:SZSE), 一个交易所的故障不熔断其他交易所
+        """
+        self._sources[source] = func
+        self._breakers[source] = breaker or source
+        self._stats.setdefault(source, SourceStats())
+        return self
+
+    def breaker(self, source: str) -> CircuitBreaker:
+        return self.policy.breaker(self._breakers[source])
+
+    def load(self) -> None:
+        """从 SOURCE_STATS 加载已注册数据源的统计, 失败时保留内存中的统计"""
+        self._loaded = True
+        try:
+            df = DuckDBManager.query_df(
+                f"SELECT * FROM {self.TABLE} WHERE registry = ?;", db_path=self.db_path, params=(self.name,)
+            )
+        except Exception as e:
+            print(f"SourceRegistry: {self.name} 加载统计失败: {e}")
+            return
+        with self._lock:
+            for row in df.itertuples(index=False):
+                if row.source in self._stats:
+                    self._stats[row.source] = SourceStats(
+                        latency=float(row.latency),
+                        success_rate=float(row.success_rate),
+                        calls=int(row.calls),
+                        failures=int(row.failures),
+                        last_error=None if pd.isna(row.last_error) else row.last_error,
+                    )
+
+    def save(self) -> None:
+        """把当前统计写回 SOURCE_STATS(未传 db_path 时不做任何事), 应在写库线程中调用"""
+        if self.db_path is None:
+            return
+        with self._lock:
+            rows = [{"registry": self.name, "source": k, **asdict(s)} for k, s in self._stats.items()]
+        df = pd.DataFrame(rows).assign(updated_at=datetime.now())
+        try:
+            DuckDBManager.upsert_df(self.TABLE, df, key_columns=("registry", "source"), db_path=self.db_path)
+        except Exception as e:
+            print(f"SourceRegistry: {self.name} 保存统计失败: {e}")
+
+    def _record(self, source: str, elapsed: float, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            s = self._stats[source]
+            s.calls += 1
+            s.success_rate += self.alpha * ((error is None) - s.success_rate)
+            if error is None:
+                s.latency = elapsed if s.calls - s.failures == 1 else s.latency + self.alpha * (elapsed - s.latency)
+            else:
+                s.failures += 1
+                s.last_error = f"{type(error).__name__}: {error}"
+
+    def ranked(self) -> List[str]:
+        """当前排名, 最优在前"""
+
+        def key(source: str):
+            s = self._stats[source]
+            order = self.priority.index(source) if source in self.priority else len(self.priority)
+            if s.calls == s.failures:  # 未调用过或没有成功记录, 也就没有延迟数据
+                score = float("inf")
+            else:
+                score = s.latency / max(s.success_rate, 0.05)
+            return (self.breaker(source).is_open, order, score)
+
+        with self._lock:
+            return sorted(self._sources, key=key)
+
+    def call(self, source: str) -> Any:
+        """调用指定数据源并记入统计"""
+        start = time.perf_counter()
+        try:
+            result = self.policy.call(self._breakers[source], self._sources[source])
+        except Exception as e:
+            self._record(source, time.perf_counter() - start, e)
+            raise
+        self._record(source, time.perf_counter() - start)
+        return result
+
+    def fetch(self) -> Any:
+        """按 mode 调用数据源, 全部失败时抛出 CircuitOpenError"""
+        if not self._loaded:
+            self.load()
+        ranked = [s for s in self.ranked() if not self.breaker(s).is_open]
+        errors = [f"{s}: 熔断中" for s in self._sources if s not in ranked]
+        if self.mode == "race" and len(ranked) > 1:
+            result = self._race(ranked[: self.race_width], errors)
+            if result is not None:
+                return result[0]
+            ranked = ranked[self.race_width :]
+        for source in ranked:
+            try:
+                return self.call(source)
+            except Exception as e:
+                print(f"SourceRegistry: {self.name} 数据源 {source} 失败, 切换下一个: {e}")
+                errors.append(f"{source}: {e}")
+        raise CircuitOpenError(f"{self.name} 所有数据源均不可用: {'; '.join(errors)}")
+
+    def _race(self, sources: Sequence[str], errors: List[str]) -> Optional[tuple]:
+        pool = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix=f"race-{self.name}")
+        pending = {pool.submit(self.call, s): s for s in sources}
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source = pending.pop(future)
+                    if future.exception() is None:
+                        return (future.result(),)
+                    print(f"SourceRegistry: {self.name} 数据源 {source} 失败: {future.exception()}")
+                    errors.append(f"{source}: {future.exception()}")
+            return None
+        finally:
+            pool.shutdown(wait=False)  # 落后的数据源在后台跑完, 只用于更新统计
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._sources)
+
+    @property
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                source: {
+                    "latency": round(s.latency, 3),
+                    "success_rate": round(s.success_rate, 3),
+                    "calls": s.calls,
+                    "failures": s.failures,
+                    "last_error": s.last_error,
+                    "circuit_open": self.breaker(source).is_open,
+                }
+                for source, s in self._stats.items()
+            }
+
+
+__all__ = ["SourceRegistry", "SourceStats"]
@@ -0,0 +1,60 @@
+import os
+import pandas as pd
+import pytest
+from utils import DuckDBManager
+
+SCOPE = {"ex": ("X",)}  # 范围内但不在 df 中的行视为删除
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = os.path.join(tmp_path, "test.duckdb")
+    yield path
+    DuckDBManager.close()
+
+
+def _history(db_path):
+    return DuckDBManager.query_df(
+        "SELECT code, name, change_type, changed_columns, valid_from, valid_to FROM T_HISTORY ORDER BY valid_from, code;",
+        db_path,
+    )
+
+
+def test_upsert_df_history_versions(db_path):
+    first = pd.DataFrame({"ex": "X", "code": ["A", "B"], "name": ["a", "b"]})
+    counts = DuckDBManager.upsert_df("T", first, ("code",), db_path, scope=SCOPE, history_table="T_HISTORY")
+    assert counts == {"inserted": 2, "updated": 0, "deleted": 0}
+    assert _history(db_path)["change_type"].tolist() == ["insert", "insert"]
+
+    second = pd.DataFrame({"ex": "X", "code": ["A", "C"], "name": ["a2", "c"]})
+    counts = DuckDBManager.upsert_df("T", second, ("code",), db_path, scope=SCOPE, history_table="T_HISTORY")
+    assert counts == {"inserted": 1, "updated": 1, "deleted": 1}
+
+    h = _history(db_path)
+    latest = h[h["valid_from"] == h["valid_from"].max()].set_index("code")
+    assert latest.loc["A", "change_type"] == "update"
+    assert list(latest.loc["A", "changed_columns"]) == ["name"]
+    assert latest.loc["C", "change_type"] == "insert"
+    assert latest.loc["B", "change_type"] == "delete"
+    assert latest.loc["B", "valid_to"] == latest.loc["B", "valid_from"]  # delete 版本为空区间
+    old = h[h["valid_from"] == h["valid_from"].min()].set_index("code")
+    assert (old["valid_to"] == latest.loc["A", "valid_from"]).all()  # 旧版本在本次刷新时关闭
+    assert h["valid_to"].isna().sum() == 2  # 当前版本: A(a2), C
+
+    counts = DuckDBManager.upsert_df("T", second, ("code",), db_path, scope=SCOPE, history_table="T_HISTORY")
+    assert counts == {"inserted": 0, "updated": 0, "deleted": 0}
+    assert len(_history(db_path)) == len(h)  # 没有变化不追加版本
+    assert DuckDBManager.query_df("SELECT code, name FROM T ORDER BY code;", db_path).values.tolist() == [
+        ["A", "a2"],
+        ["C", "c"],
+    ]
+
+
+def test_insert_or_replace_df_keeps_other_rows(db_path):
+    first = pd.DataFrame({"symbol": ["A", "A", "B"], "ts": [1, 2, 1], "close": [1.0, 2.0, 3.0]})
+    assert DuckDBManager.insert_or_replace_df("BARS", first, ("symbol", "ts"), db_path) == 3
+    second = pd.DataFrame({"symbol": ["A", "A"], "ts": [2, 3], "close": [2.5, 4.0]})
+    DuckDBManager.insert_or_replace_df("BARS", second, ("symbol", "ts"), db_path)
+    DuckDBManager.insert_or_replace_df("BARS", second, ("symbol", "ts"), db_path)  # 重跑幂等
+    rows = DuckDBManager.query_df("SELECT symbol, ts, close FROM BARS ORDER BY symbol, ts;", db_path)
+    assert rows.values.tolist() == [["A", 1, 1.0], ["A", 2, 2.5], ["A", 3, 4.0], ["B", 1, 3.0]]
@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from utils import PageFetcher
+
+
+class FakeFetcher(PageFetcher):
+    def __init__(self):
+        super().__init__(concurrency=2, per_host=2)
+        self.calls = []
+
+    def _get(self, url, params, headers, parse):
+        self.calls.append(params)
+        return {"page": params["pn"]}
+
+
+def test_fetch_requires_async_with():
+    fetcher = FakeFetcher()
+    with pytest.raises(RuntimeError, match="async with"):
+        asyncio.run(fetcher.fetch("https://example.com/list", {"pn": 1}))
+
+    async def closed_after_exit():
+        async with fetcher:
+            pass
+        await fetcher.fetch("https://example.com/list", {"pn": 1})
+
+    with pytest.raises(RuntimeError, match="async with"):
+        asyncio.run(closed_after_exit())
+    assert fetcher.calls == []
+
+
+def test_fetch_all_keeps_page_order():
+    async def run():
+        async with FakeFetcher() as fetcher:
+            return await fetcher.fetch_all("https://example.com/list", [{"pn": n} for n in range(1, 6)])
+
+    assert asyncio.run(run()) == [{"page": n} for n in range(1, 6)]
@@ -0,0 +1,53 @@
+import glob
+import os
+from datetime import datetime, timedelta
+import pandas as pd
+from utils import ParquetLake
+
+
+def _bars(symbol, start, n, close):
+    ts = [start + timedelta(days=i) for i in range(n)]
+    return pd.DataFrame(
+        {
+            "symbol": symbol,
+            "period": "Day",
+            "ts": pd.to_datetime(ts).astype("datetime64[us]"),
+            "open": close,
+            "high": close,
+            "low": close,
+            "close": close,
+            "volume": 100,
+            "turnover": 1.0,
+        }
+    )
+
+
+def _files(root):
+    return glob.glob(os.path.join(root, "**", "*.parquet"), recursive=True)
+
+
+def test_compact_merges_and_keeps_last_write(tmp_path):
+    lake = ParquetLake(str(tmp_path))
+    start = datetime(2025, 1, 1)
+    lake.append(_bars("700.HK", start, 5, 1.0))
+    lake.append(_bars("700.HK", start + timedelta(days=3), 5, 2.0))  # 与上一批重叠 2 天
+    lake.append(_bars("TSLA.US", start, 3, 3.0))
+    assert len(_files(tmp_path)) == 3
+
+    assert lake.compact() == 1  # 只有 700.HK 的分区有多个文件
+    assert len(_files(tmp_path)) == 2
+    assert not glob.glob(os.path.join(tmp_path, "**", "*.tmp"), recursive=True)
+
+    bars = lake.read(symbol="700.HK").to_pandas()
+    assert len(bars) == 8
+    assert bars["ts"].is_monotonic_increasing
+    assert bars["close"].tolist() == [1.0] * 3 + [2.0] * 5  # 重叠的行保留后写入的
+    assert lake.compact() == 0
+
+
+def test_read_missing_partition_returns_schema(tmp_path):
+    lake = ParquetLake(str(tmp_path))
+    empty = lake.read(symbol="700.HK")
+    assert empty.num_rows == 0
+    assert empty.schema == ParquetLake.SCHEMA
+    assert lake.read(symbol="700.HK", columns=["ts", "close"]).column_names == ["ts", "close"]
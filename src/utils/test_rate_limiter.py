@@ -0,0 +1,20 @@
+import dataclasses
+from config import get_config
+from utils import RateLimiter
+
+
+def test_configure_from_zero_intervals_means_unlimited():
+    conf = dataclasses.replace(
+        get_config(), akshare_sleep_min=0, akshare_sleep_max=0, gemini_request_delay=0, bot_rate_limit_window=0
+    )
+    RateLimiter.configure_from(conf)
+    for name in ("akshare", "gemini", "bot"):
+        assert RateLimiter.get(name).rate is None
+        assert RateLimiter.get(name).acquire() == 0.0
+
+
+def test_configure_from_intervals():
+    conf = dataclasses.replace(get_config(), akshare_sleep_min=1, akshare_sleep_max=3, bot_rate_limit_window=10)
+    RateLimiter.configure_from(conf)
+    assert RateLimiter.get("akshare").rate == 0.5
+    assert RateLimiter.get("bot").rate == conf.bot_rate_limit_requests / 10
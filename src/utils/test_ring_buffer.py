@@ -0,0 +1,56 @@
+import numpy as np
+from utils import RingBuffer
+
+DTYPE = [("ts", "i8"), ("price", "f8")]
+
+
+def _rows(views):
+    return [int(x) for v in views for x in v["ts"]]
+
+
+def test_append_and_cursor_read():
+    buf = RingBuffer(DTYPE, 4)
+    cursor = buf.cursor()
+    for i in range(3):
+        buf.append((i, float(i)))
+    assert _rows(cursor.read()) == [0, 1, 2]
+    assert cursor.read() == []
+    assert buf.last()["ts"] == 2
+    assert len(buf) == 3
+
+
+def test_wraparound_returns_two_views_without_copy():
+    buf = RingBuffer(DTYPE, 4)
+    cursor = buf.cursor()
+    for i in range(3):
+        buf.append((i, 0.0))
+    cursor.read()
+    for i in range(3, 6):
+        buf.append((i, 0.0))
+    views = cursor.read()
+    assert len(views) == 2
+    assert _rows(views) == [3, 4, 5]
+    assert all(np.shares_memory(v, buf._data) for v in views)
+    assert _rows(buf.latest(4)) == [2, 3, 4, 5]
+    assert len(buf) == 4
+
+
+def test_slow_reader_counts_dropped():
+    buf = RingBuffer(DTYPE, 4)
+    cursor = buf.cursor()
+    for i in range(10):
+        buf.append((i, 0.0))
+    assert cursor.pending == 10
+    assert _rows(cursor.read()) == [6, 7, 8, 9]
+    assert cursor.dropped == 6
+
+
+def test_read_limit_and_from_start():
+    buf = RingBuffer(DTYPE, 4)
+    for i in range(6):
+        buf.append((i, 0.0))
+    cursor = buf.cursor(from_start=True)
+    assert _rows(cursor.read(limit=3)) == [2, 3, 4]
+    assert _rows(cursor.read()) == [5]
+    assert cursor.dropped == 0
+    assert RingBuffer(DTYPE, 4).last() is None
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+import pytest
+from utils import SingleFlight
+
+
+def test_do_coalesces_concurrent_calls():
+    sf = SingleFlight()
+    runs = []
+
+    def load():
+        runs.append(1)
+        time.sleep(0.1)
+        return object()
+
+    results = [None] * 8
+
+    def worker(i):
+        results[i] = sf.do("k", load)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(runs) == 1
+    assert all(r is results[0] for r in results)
+    assert sf.stats == {"executed": 1, "shared": 7}
+
+
+def test_do_shares_error_and_releases_key():
+    sf = SingleFlight()
+
+    def boom():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        sf.do("k", boom)
+    assert sf.do("k", lambda: 1) == 1  # 调用结束后 key 已释放, 重新执行
+
+
+def test_do_async_coalesces():
+    sf = SingleFlight()
+    runs = []
+
+    async def load():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        return await asyncio.gather(*(sf.do_async("k", load) for _ in range(5)))
+
+    assert asyncio.run(main()) == [42] * 5
+    assert len(runs) == 1
+
+
+def test_do_async_leader_cancel_keeps_followers():
+    sf = SingleFlight()
+    runs = []
+
+    async def load():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        leader = asyncio.create_task(sf.do_async("k", load))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(sf.do_async("k", load)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await asyncio.gather(leader, *followers, return_exceptions=True)
+
+    leader, *followers = asyncio.run(main())
+    assert isinstance(leader, asyncio.CancelledError)
+    assert followers == [42, 42]
+    assert len(runs) == 1
+
+
+def test_do_async_all_waiters_cancelled_cancels_call():
+    sf = SingleFlight()
+    finished = []
+
+    async def load():
+        await asyncio.sleep(1)
+        finished.append(1)
+
+    async def main():
+        task = asyncio.create_task(sf.do_async("k", load))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        assert sf._futures == {}
+
+    asyncio.run(main())
+    assert finished == []
@@ -0,0 +1,48 @@
+import os
+import pytest
+from utils import DuckDBManager, DuckDBSchema, ResiliencePolicy, SourceRegistry
+
+
+def _policy():
+    return ResiliencePolicy(max_retries=0, base_delay=0)
+
+
+def _fail():
+    raise ValueError("boom")
+
+
+def test_priority_source_kept_while_healthy():
+    calls = []
+    registry = (
+        SourceRegistry("T.priority", _policy(), priority=["szse", "eastmoney"])
+        .register("szse", lambda: calls.append("szse") or "szse", breaker="T.priority:szse")
+        .register("eastmoney", lambda: calls.append("eastmoney") or "eastmoney", breaker="T.priority:eastmoney")
+    )
+    registry._stats["szse"].calls = 1
+    registry._stats["szse"].latency = 5.0  # 官方源明显更慢, 但仍优先使用
+    assert [registry.fetch() for _ in range(3)] == ["szse"] * 3
+    assert calls == ["szse"] * 3
+
+
+def test_alternate_used_only_on_failure():
+    registry = (
+        SourceRegistry("T.failover", _policy(), priority=["szse", "eastmoney"])
+        .register("szse", _fail, breaker="T.failover:szse")
+        .register("eastmoney", lambda: "eastmoney", breaker="T.failover:eastmoney")
+    )
+    assert registry.fetch() == "eastmoney"
+    assert registry.stats["szse"]["failures"] == 1
+    assert registry.ranked() == ["szse", "eastmoney"]  # 熔断器未打开, 下次仍先试官方源
+
+
+def test_stats_saved_only_by_caller(tmp_path):
+    db_path = os.path.join(tmp_path, "test.duckdb")
+    DuckDBSchema.migrate(db_path)
+    registry = SourceRegistry("T.persist", _policy(), db_path=db_path).register("szse", lambda: 1, breaker="T.p")
+    registry.fetch()
+    assert DuckDBManager.query_df("SELECT * FROM SOURCE_STATS;", db_path).empty  # fetch 不写库
+    registry.save()
+    restored = SourceRegistry("T.persist", _policy(), db_path=db_path).register("szse", lambda: 1, breaker="T.p")
+    restored.load()
+    assert restored.stats["szse"]["calls"] == 1
+    DuckDBManager.close()
@@ -0,0 +1,79 @@
+import zipfile
+from io import BytesIO
+import pandas as pd
+from utils.xlsx_reader import read_xlsx
+
+_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+# 共享字符串: 第 2 项带日文注音 <rPh>, 第 3 项为富文本
+_SHARED = [
+    "<si><t>代码</t></si>",
+    "<si><t>名称</t></si>",
+    "<si><t>東京電力</t><rPh sb='0' eb='2'><t>トウキョウ</t></rPh><phoneticPr fontId='1'/></si>",
+    "<si><r><t>腾讯</t></r><r><rPr><b/></rPr><t>控股</t></r></si>",
+    "<si><t>板块</t></si>",
+    "<si><t>主板</t></si>",
+]
+# 代码列为整数写法的各种变体: 700 / 1E3 / 12.0, 一行缺少名称
+_ROWS = [
+    "<row r='1'><c r='A1' t='s'><v>0</v></c><c r='B1' t='s'><v>1</v></c><c r='C1' t='s'><v>4</v></c></row>",
+    "<row r='2'><c r='A2'><v>9501</v></c><c r='B2' t='s'><v>2</v></c><c r='C2' t='s'><v>5</v></c></row>",
+    "<row r='3'><c r='A3'><v>700</v></c><c r='B3' t='s'><v>3</v></c><c r='C3' t='s'><v>5</v></c></row>",
+    "<row r='4'><c r='A4'><v>1E3</v></c><c r='C4' t='s'><v>5</v></c></row>",
+    "<row r='5'><c r='A5'><v>12.0</v></c><c r='B5' t='inlineStr'><is><t>平安</t></is></c><c r='C5' t='s'><v>5</v></c></row>",
+]
+
+
+def _workbook() -> bytes:
+    files = {
+        "[Content_Types].xml": (
+            "<Types xmlns='http://schemas.openxmlformats.org/package/2006/content-types'>"
+            "<Default Extension='rels' ContentType='application/vnd.openxmlformats-package.relationships+xml'/>"
+            "<Default Extension='xml' ContentType='application/xml'/>"
+            "<Override PartName='/xl/workbook.xml' "
+            "ContentType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml'/>"
+            "<Override PartName='/xl/worksheets/sheet1.xml' "
+            "ContentType='application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml'/>"
+            "<Override PartName='/xl/sharedStrings.xml' "
+            "ContentType='application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml'/>"
+            "</Types>"
+        ),
+        "_rels/.rels": (
+            f"<Relationships xmlns='{_PKG}'><Relationship Id='rId1' Target='xl/workbook.xml' "
+            f"Type='{_REL}/officeDocument'/></Relationships>"
+        ),
+        "xl/workbook.xml": (
+            f"<workbook xmlns='{_MAIN}' xmlns:r='{_REL}'>"
+            "<sheets><sheet name='Sheet1' sheetId='1' r:id='rId1'/></sheets></workbook>"
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            f"<Relationships xmlns='{_PKG}'>"
+            f"<Relationship Id='rId1' Target='worksheets/sheet1.xml' Type='{_REL}/worksheet'/>"
+            f"<Relationship Id='rId2' Target='sharedStrings.xml' Type='{_REL}/sharedStrings'/>"
+            "</Relationships>"
+        ),
+        "xl/sharedStrings.xml": f"<sst xmlns='{_MAIN}'>{''.join(_SHARED)}</sst>",
+        "xl/worksheets/sheet1.xml": f"<worksheet xmlns='{_MAIN}'><sheetData>{''.join(_ROWS)}</sheetData></worksheet>",
+    }
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, xml in files.items():
+            zf.writestr(name, xml)
+    return buf.getvalue()
+
+
+def test_read_xlsx_matches_read_excel():
+    content = _workbook()
+    expected = pd.read_excel(BytesIO(content), usecols=["代码", "名称"])
+    for engine in ("xml", "openpyxl"):
+        df = read_xlsx(content, usecols=["代码", "名称"], engine=engine)
+        pd.testing.assert_frame_equal(df, expected)
+    assert expected["名称"].tolist()[:2] == ["東京電力", "腾讯控股"]  # 不含注音
+    assert expected["代码"].tolist() == [9501, 700, 1000, 12]
+
+
+def test_read_xlsx_filters_during_read():
+    df = read_xlsx(_workbook(), usecols=["名称"], filters={"代码": [700, 12]}, engine="xml")
+    assert df["名称"].tolist() == ["腾讯控股", "平安"]
@@ -0,0 +1,229 @@
+import zipfile
+from io import BytesIO
+from typing import Collection, Dict, Iterator, List, Literal, Mapping, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from xml.etree.ElementTree import iterparse
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # 可选依赖, 未安装时使用 openpyxl 流式读取
+    CalamineWorkbook = None
+
+
+def _ints(row: Sequence) -> List:
+    """整数值的浮点数转为 int(1E3 / 12.0 -> 1000 / 12), 与 pd.read_excel 一致"""
+    return [int(v) if isinstance(v, float) and v.is_integer() else v for v in row]
+
+
+def _iter_rows_openpyxl(content: bytes) -> Iterator[List]:
+    wb = load_workbook(BytesIO(content), read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()  # 部分导出文件的 dimension 记录不准, 按实际行读取
+        for row in ws.iter_rows(values_only=True):
+            yield _ints(row)
+    finally:
+        wb.close()
+
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_COLUMNS: Dict[str, int] = {}
+
+
+def _col_index(ref: str) -> int:
+    """单元格引用转列号(从 0 开始): "B12" -> 1"""
+    letters = ref.rstrip("0123456789")
+    n = _COLUMNS.get(letters)
+    if n is None:
+        n = 0
+        for ch in letters:
+            n = n * 26 + ord(ch) - 64
+        n = _COLUMNS[letters] = n - 1
+    return n
+
+
+def _first_sheet_path(zf: zipfile.ZipFile) -> str:
+    with zf.open("xl/workbook.xml") as f:
+        sheet = next(e for _, e in iterparse(f) if e.tag == f"{_NS}sheet")
+    rid = sheet.get(f"{_REL_NS}id")
+    with zf.open("xl/_rels/workbook.xml.rels") as f:
+        target = next(e.get("Target") for _, e in iterparse(f) if e.get("Id") == rid)
+    return target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+
+
+def _text(e) -> str:
+    """<si>/<is> 的文本: 直接的 <t> 与富文本 <r><t>, 不含注音 <rPh> 中的 <t>"""
+    parts = []
+    for child in e:
+        if child.tag == f"{_NS}t":
+            parts.append(child.text or "")
+        elif child.tag == f"{_NS}r":
+            parts.append(child.findtext(f"{_NS}t") or "")
+    return "".join(parts)
+
+
+def _iter_rows_xml(content: bytes) -> Iterator[List]:
+    """
+    直接解析 sheet XML(iterparse 逐行, 处理完即释放), 跳过 openpyxl 的单元格对象与样式处理
+    只识别共享字符串/内联字符串/布尔/数字, 不做日期转换(证券列表没有日期列)
+    """
+    with zipfile.ZipFile(BytesIO(content)) as zf:
+        shared: List[str] = []
+        if "xl/sharedStrings.xml" in zf.namelist():
+            with zf.open("xl/sharedStrings.xml") as f:
+                for _, e in iterparse(f):
+                    if e.tag == f"{_NS}si":
+                        shared.append(_text(e))
+                        e.clear()
+        with zf.open(_first_sheet_path(zf)) as f:
+            expected = 1
+            for _, e in iterparse(f):
+                if e.tag != f"{_NS}row":
+                    continue
+                r = int(e.get("r", expected))
+                while expected < r:  # 空行在文件中不出现, 补齐以保持行号与 header 对齐
+                    yield []
+                    expected += 1
+                row: List = []
+                for c in e.iter(f"{_NS}c"):
+                    i = _col_index(c.get("r")) if c.get("r") else len(row)
+                    if i > len(row):
+                        row.extend([None] * (i - len(row)))
+                    t = c.get("t")
+                    if t == "inlineStr":
+                        is_ = c.find(f"{_NS}is")
+                        value = "" if is_ is None else _text(is_)
+                    else:
+                        v = c.findtext(f"{_NS}v")
+                        if v is None:
+                            value = None
+                        elif t == "s":
+                            value = shared[int(v)]
+                        elif t == "b":
+                            value = v == "1"
+                        elif t in ("str", "e"):
+                            value = v
+                        else:
+                            try:
+                                value = int(v)
+                            except ValueError:  # 1E3 / 1e-2 / 12.0 等写法按数值判断是否为整数
+                                x = float(v)
+                                value = int(x) if x.is_integer() else x
+                    row.append(value)
+                e.clear()
+                expected = r + 1
+                yield row
+
+
+def _iter_rows_calamine(content: bytes) -> Iterator[List]:
+    sheet = CalamineWorkbook.from_filelike(BytesIO(content)).get_sheet_by_index(0)
+    for row in sheet.to_python(skip_empty_area=False):
+        yield _ints(row)
+
+
+def read_xlsx(
+    content: bytes,
+    usecols: Sequence[str],
+    header: int = 0,
+    filters: Optional[Mapping[str, Collection]] = None,
+    engine: Literal["auto", "calamine", "xml", "openpyxl"] = "auto",
+) -> pd.DataFrame:
+    """
+    流式读取 xlsx 第一个工作表, 读取过程中完成行过滤和列投影
+    - header: 表头所在行(从 0 开始, 与 pd.read_excel 一致)
+    - filters: {列名: 允许的取值}, 不满足的行直接丢弃, 过滤列不必出现在 usecols 中
+    - engine: auto 时优先 python-calamine(已安装), 否则直接流式解析 sheet XML;
+      openpyxl 为兼容模式(read_only 逐行读取), 用于 XML 解析不支持的文件
+    空单元格为 NaN, 与 pd.read_excel 的结果保持一致
+    """
+    if engine == "auto":
+        engine = "calamine" if CalamineWorkbook is not None else "xml"
+    rows = {"calamine": _iter_rows_calamine, "xml": _iter_rows_xml, "openpyxl": _iter_rows_openpyxl}[engine](content)
+    for _ in range(header):
+        next(rows, None)
+    names = [None if v is None else str(v).strip() for v in next(rows, ())]
+    missing = [c for c in (*usecols, *(filters or {})) if c not in names]
+    if missing:
+        raise ValueError(f"xlsx 缺少列: {missing}")
+    take = [names.index(c) for c in usecols]
+    checks: List[Tuple[int, Collection]] = [(names.index(c), set(v)) for c, v in (filters or {}).items()]
+    width = max(take + [i for i, _ in checks]) + 1
+    data: List[List] = []
+    for row in rows:
+        if len(row) < width:
+            row = (*row, *([None] * (width - len(row))))
+        if all(row[i] in allowed for i, allowed in checks):
+            data.append([row[i] for i in take])
+    df = pd.DataFrame(data, columns=list(usecols), dtype=object)
+    # calamine 空单元格为 "", openpyxl 为 None, 统一为 NaN
+    return df.replace("", np.nan).fillna(np.nan).infer_objects()
+
+
+if __name__ == "__main__":
+    # 用录制的交易所文件对比 pd.read_excel 与流式读取:
+    # python -m utils.xlsx_reader hkex ListOfSecurities_c.xlsx szse szse_1110.xlsx
+    # 也可以直接传入 HttpCache 保存的 *.body.gz, 或 utils.replay 录制的目录:
+    # python -m utils.xlsx_reader --cassette data/replay
+    import glob
+    import gzip
+    import json
+    import os
+    import sys
+    import time
+
+    PROFILES: Dict[str, dict] = {
+        "hkex": dict(
+            header=2,
+            usecols=["股份代號", "股份名稱", "次分類"],
+            filters={"分類": ["股本"], "交易貨幣": ["HKD"], "次分類": ["股本證券(主板)", "股本證券(創業板)"]},
+        ),
+        "szse": dict(header=0, usecols=["板块", "A股代码", "A股简称"]),
+    }
+
+    # 录制目录中按 url 识别交易所文件
+    URLS = {"hkex": "ListOfSecurities", "szse": "SHOWTYPE=xlsx"}
+
+    def recorded(root: str) -> List[str]:
+        found = []
+        for meta_path in sorted(glob.glob(os.path.join(root, "*.json"))):
+            with open(meta_path, encoding="utf-8") as f:
+                url = json.load(f)["url"]
+            for name, marker in URLS.items():
+                if marker in url:
+                    found += [name, meta_path[: -len(".json")] + ".body.gz"]
+        if not found:
+            sys.exit(f"{root} 中没有录制的 HKEX/SZSE xlsx, 先运行 python -m utils.replay record")
+        return found
+
+    def load(path: str) -> bytes:
+        with gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb") as f:
+            return f.read()
+
+    def pandas_baseline(content: bytes, header: int, usecols: Sequence[str], filters=None) -> pd.DataFrame:
+        df = pd.read_excel(BytesIO(content), header=header, usecols=[*usecols, *(filters or {})])
+        for c, allowed in (filters or {}).items():
+            df = df[df[c].isin(allowed)]
+        return df[list(usecols)]
+
+    def bench(label: str, func, repeat: int = 3) -> pd.DataFrame:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            df = func()
+            best = min(best, time.perf_counter() - start)
+        print(f"  {label:<20} {best * 1000:9.1f} ms  {len(df)} 行")
+        return df
+
+    args = recorded(sys.argv[2]) if sys.argv[1:2] == ["--cassette"] else sys.argv[1:]
+    for name, path in zip(args[::2], args[1::2]):
+        content, profile = load(path), PROFILES[name]
+        print(f"{name}: {path} ({len(content) / 1024:.0f} KiB)")
+        base = bench("pd.read_excel", lambda: pandas_baseline(content, **profile))
+        bench("openpyxl read_only", lambda: read_xlsx(content, engine="openpyxl", **profile))
+        fast = bench("xml stream", lambda: read_xlsx(content, engine="xml", **profile))
+        assert len(base) == len(fast), "流式读取结果行数不一致"
+        if CalamineWorkbook is not None:
+            bench("calamine", lambda: read_xlsx(content, engine="calamine", **profile))